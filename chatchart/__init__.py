@@ -1,6 +1,9 @@
 from .chatchart import Chatchart
 
-__red_end_user_data_statement__ = "This cog does not persistently store data or metadata about users."
+__red_end_user_data_statement__ = (
+    "This cog does store discord IDs and names of message authors as needed for operation. "
+    "These are kept for the recent messages of the channels that charts were made of."
+)
 
 
 def setup(bot):
@@ -6,9 +6,11 @@
 
 import asyncio
 import discord
+import gzip
 import heapq
+import json
 from io import BytesIO
-from typing import List, Optional, Tuple, Union
+from typing import List, Literal, Optional, Tuple, Union
 
 import matplotlib
 
@@ -18,14 +20,24 @@ import matplotlib.pyplot as plt
 plt.switch_backend("agg")
 
 from redbot.core import checks, commands, Config
+from redbot.core.data_manager import cog_data_path
+
+from .history_index import ChannelIndex
 
 
 class Chatchart(commands.Cog):
     """Show activity."""
 
-    async def red_delete_data_for_user(self, **kwargs):
-        """ Nothing to delete """
-        return
+    async def red_delete_data_for_user(
+        self, *, requester: Literal["discord", "owner", "user", "user_strict"], user_id: int,
+    ):
+        """Remove the user's id and names from the message count indexes, the messages stay in the counts."""
+        for path in self.index_path.glob("*.json.gz"):
+            channel_id = int(path.name.split(".")[0])
+            async with self.get_index_lock(channel_id):
+                index = await self.load_index(channel_id)
+                if index.remove_author(user_id):
+                    await self.save_index(channel_id, index)
 
     def __init__(self, bot):
         self.bot = bot
@@ -37,18 +49,24 @@ class Chatchart(commands.Cog):
         self.config.register_guild(**default_guild)
         self.config.register_global(**default_global)
 
+        # one file per channel with the authors of its recent messages
+        self.index_path = cog_data_path(self) / "channels"
+        self.index_path.mkdir(exist_ok=True)
+        # channel id: lock for reading and updating the channel's index
+        self.index_locks = {}
+
     @staticmethod
-    def calculate_member_perc(history: List[discord.Message]) -> dict:
-        """Calculate the member count from the message history"""
+    def calculate_member_perc(authors: list) -> dict:
+        """Calculate the member count from the authors of the message history"""
         msg_data = {"total_count": 0, "users": {}}
-        for msg in history:
+        for author in authors:
             # Name formatting
-            if len(msg.author.display_name) >= 20:
-                short_name = "{}...".format(msg.author.display_name[:20]).replace("$", "\\$")
+            if len(author.display_name) >= 20:
+                short_name = "{}...".format(author.display_name[:20]).replace("$", "\\$")
             else:
-                short_name = msg.author.display_name.replace("$", "\\$").replace("_", "\\_ ").replace("*", "\\*")
-            whole_name = "{}#{}".format(short_name, msg.author.discriminator)
-            if msg.author.bot:
+                short_name = author.display_name.replace("$", "\\$").replace("_", "\\_ ").replace("*", "\\*")
+            whole_name = "{}#{}".format(short_name, author.discriminator)
+            if author.bot:
                 pass
             elif whole_name in msg_data["users"]:
                 msg_data["users"][whole_name]["msgcount"] += 1
@@ -140,13 +158,17 @@ class Chatchart(commands.Cog):
         self,
         channel: discord.TextChannel,
         animation_message: discord.Message,
-        messages: int
+        messages: int,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
     ) -> List[discord.Message]:
-        """Fetch the history of a channel while displaying an status message with it"""
+        """Fetch the history of a channel, newest first, while displaying an status message with it"""
         animation_message_deleted = False
         history = []
         history_counter = 0
-        async for msg in channel.history(limit=messages):
+        before = discord.Object(id=before) if before else None
+        after = discord.Object(id=after) if after else None
+        async for msg in channel.history(limit=messages, before=before, after=after, oldest_first=False):
             history.append(msg)
             history_counter += 1
             await asyncio.sleep(0.005)
@@ -165,6 +187,64 @@ class Chatchart(commands.Cog):
                         animation_message_deleted = True
         return history
 
+    def get_index_lock(self, channel_id: int) -> asyncio.Lock:
+        if channel_id not in self.index_locks:
+            self.index_locks[channel_id] = asyncio.Lock()
+        return self.index_locks[channel_id]
+
+    async def load_index(self, channel_id: int) -> ChannelIndex:
+        path = self.index_path / f"{channel_id}.json.gz"
+
+        def read():
+            try:
+                return json.loads(gzip.decompress(path.read_bytes()))
+            except (OSError, EOFError, ValueError):
+                # a missing or damaged index is built again
+                return None
+
+        data = await asyncio.get_running_loop().run_in_executor(None, read)
+        return ChannelIndex.from_json(data) if data else ChannelIndex()
+
+    async def save_index(self, channel_id: int, index: ChannelIndex):
+        path = self.index_path / f"{channel_id}.json.gz"
+        data = gzip.compress(json.dumps(index.to_json(), separators=(",", ":")).encode())
+        await asyncio.get_running_loop().run_in_executor(None, path.write_bytes, data)
+
+    async def fetch_recent_authors(
+        self,
+        channel: discord.TextChannel,
+        animation_message: discord.Message,
+        messages: int
+    ) -> list:
+        """
+        Get the authors of the last messages of a channel from its index,
+        only fetching the messages sent since the index was last updated.
+        """
+        async with self.get_index_lock(channel.id):
+            index = await self.load_index(channel.id)
+            # the index keeps as many messages as the largest chart of the channel needed
+            size = max(messages, len(index))
+            # a complete index without blocks is a channel that was empty, everything sent since then is newer
+            if index.blocks or index.complete:
+                newer = await self.fetch_channel_history(channel, animation_message, messages, after=index.newest)
+                if len(newer) >= messages:
+                    # there can be messages between the index and these that weren't fetched
+                    index = ChannelIndex()
+                index.add_newer(newer)
+            missing = messages - len(index)
+            if missing > 0 and not index.complete:
+                older = await self.fetch_channel_history(channel, animation_message, missing, before=index.oldest)
+                index.add_older(older, reached_start=len(older) < missing)
+            index.trim(size)
+            await self.save_index(channel.id, index)
+            return index.get_recent_authors(messages)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        async with self.get_index_lock(channel.id):
+            (self.index_path / f"{channel.id}.json.gz").unlink(missing_ok=True)
+        self.index_locks.pop(channel.id, None)
+
     @commands.guild_only()
     @commands.command()
     @commands.cooldown(1, 10, commands.BucketType.guild)
@@ -199,7 +279,7 @@ class Chatchart(commands.Cog):
         )
         loading_message = await ctx.send(embed=embed)
         try:
-            history = await self.fetch_channel_history(channel, loading_message, messages)
+            authors = await self.fetch_recent_authors(channel, loading_message, messages)
         except discord.errors.Forbidden:
             try:
                 await loading_message.delete()
@@ -207,7 +287,7 @@ class Chatchart(commands.Cog):
                 pass
             return await ctx.send("No permissions to read that channel.")
 
-        msg_data = self.calculate_member_perc(history)
+        msg_data = self.calculate_member_perc(authors)
         # If no members are found.
         if len(msg_data["users"]) == 0:
             try:
@@ -261,7 +341,7 @@ class Chatchart(commands.Cog):
             colour=await self.bot.get_embed_colour(location=ctx.channel),
         )
         global_fetch_message = await ctx.send(embed=embed)
-        global_history = []
+        global_authors = []
 
         for channel in channel_list:
             embed = discord.Embed(
@@ -271,8 +351,8 @@ class Chatchart(commands.Cog):
             )
             loading_message = await ctx.send(embed=embed)
             try:
-                history = await self.fetch_channel_history(channel, loading_message, messages)
-                global_history += history
+                authors = await self.fetch_recent_authors(channel, loading_message, messages)
+                global_authors += authors
                 await loading_message.delete()
             except discord.errors.Forbidden:
                 try:
@@ -285,7 +365,7 @@ class Chatchart(commands.Cog):
                 except discord.NotFound:
                     continue 
 
-        msg_data = self.calculate_member_perc(global_history)
+        msg_data = self.calculate_member_perc(global_authors)
         # If no members are found.
         if len(msg_data["users"]) == 0:
             try:
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+from typing import List, Optional
+
+import discord
+
+# consecutive messages kept together, old messages are dropped a block at a time
+BLOCK_SIZE = 1000
+
+
+class ChannelIndex:
+    """
+    The authors of the most recent messages of a channel, so a chart only needs the messages sent since the last one.
+
+    Messages are kept newest first in blocks of consecutive messages. The first and last message id of every block
+    is known, so old blocks can be dropped while still knowing where to fetch older messages from.
+    """
+
+    def __init__(self, authors: list = None, blocks: list = None, complete: bool = False):
+        # [author id, display name, discriminator, bot] of the authors in the blocks
+        self.authors = authors or []
+        self._author_indexes = {author[0]: index for index, author in enumerate(self.authors)}
+        # {"newest": message id, "oldest": message id, "authors": [author index, ...]}, newest first
+        self.blocks = blocks or []
+        # the oldest kept message is the first message of the channel
+        self.complete = complete
+
+    def __len__(self):
+        return sum(len(block["authors"]) for block in self.blocks)
+
+    @property
+    def newest(self) -> Optional[int]:
+        return self.blocks[0]["newest"] if self.blocks else None
+
+    @property
+    def oldest(self) -> Optional[int]:
+        return self.blocks[-1]["oldest"] if self.blocks else None
+
+    def _get_author_index(self, author: discord.abc.User, update: bool):
+        entry = [author.id, author.display_name, author.discriminator, author.bot]
+        index = self._author_indexes.get(author.id, None)
+        if index is None:
+            index = len(self.authors)
+            self.authors.append(entry)
+            self._author_indexes[author.id] = index
+        elif update:
+            # the names of newer messages are the current ones
+            self.authors[index] = entry
+        return index
+
+    def add_newer(self, messages: List[discord.Message]):
+        """Add the messages sent after the newest indexed message, newest first."""
+        if not messages:
+            return
+        # oldest first, so the names of the newest message of each author are the ones that are kept
+        authors = [self._get_author_index(msg.author, update=True) for msg in reversed(messages)]
+        authors.reverse()
+        if self.blocks and len(self.blocks[0]["authors"]) + len(authors) <= BLOCK_SIZE:
+            self.blocks[0]["authors"] = authors + self.blocks[0]["authors"]
+            self.blocks[0]["newest"] = messages[0].id
+        else:
+            self.blocks.insert(0, {"newest": messages[0].id, "oldest": messages[-1].id, "authors": authors})
+
+    def add_older(self, messages: List[discord.Message], reached_start: bool):
+        """Add the messages sent before the oldest indexed message, newest first."""
+        self.complete = reached_start
+        if not messages:
+            return
+        authors = [self._get_author_index(msg.author, update=False) for msg in messages]
+        if self.blocks and len(self.blocks[-1]["authors"]) + len(authors) <= BLOCK_SIZE:
+            self.blocks[-1]["authors"] += authors
+            self.blocks[-1]["oldest"] = messages[-1].id
+        else:
+            self.blocks.append({"newest": messages[0].id, "oldest": messages[-1].id, "authors": authors})
+
+    def trim(self, size: int):
+        """Drop the oldest blocks that aren't needed to keep at least `size` messages."""
+        dropped = False
+        while self.blocks and len(self) - len(self.blocks[-1]["authors"]) >= size:
+            self.blocks.pop()
+            dropped = True
+        if not dropped:
+            return
+        self.complete = False
+        # forget the authors that only sent dropped messages
+        used = sorted({index for block in self.blocks for index in block["authors"]})
+        new_indexes = {old_index: new_index for new_index, old_index in enumerate(used)}
+        self.authors = [self.authors[index] for index in used]
+        self._author_indexes = {author[0]: index for index, author in enumerate(self.authors)}
+        for block in self.blocks:
+            block["authors"] = [new_indexes[index] for index in block["authors"]]
+
+    def remove_author(self, author_id: int):
+        """Keep the messages of an author in the counts without the author's id or names, returns False if there are none."""
+        index = self._author_indexes.pop(author_id, None)
+        if index is None:
+            return False
+        self.authors[index] = [0, "Deleted User", "0000", False]
+        return True
+
+    def get_recent_authors(self, limit: int) -> list:
+        """The authors of the newest `limit` messages, as SimpleNamespace(display_name, discriminator, bot)."""
+        authors = [
+            SimpleNamespace(display_name=name, discriminator=discriminator, bot=bot)
+            for author_id, name, discriminator, bot in self.authors
+        ]
+        recent = []
+        for block in self.blocks:
+            recent.extend(authors[index] for index in block["authors"][: limit - len(recent)])
+            if len(recent) >= limit:
+                break
+        return recent
+
+    def to_json(self) -> dict:
+        return {"authors": self.authors, "blocks": self.blocks, "complete": self.complete}
+
+    @classmethod
+    def from_json(cls, data: dict):
+        return cls(**data)
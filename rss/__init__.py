@@ -6,4 +6,4 @@ from .rss import RSS
 async def setup(bot: commands.Bot):
     n = RSS(bot)
     bot.add_cog(n)
-    n.initialize()
+    await n.initialize()
@@ -0,0 +1,396 @@
+import aiohttp
+import argparse
+import asyncio
+import email.utils
+import hashlib
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+from redbot.core import data_manager
+
+from .feed_health import HOST_REQUESTS_PER_SECOND
+from .rss import RSS
+from .rss_feed import RssFeed
+
+# Offline benchmark of the feed pipeline, run it with `python -m rss.benchmark` from the repository root.
+# Fixture feeds are served from a local web server and checked by a cog instance with a throwaway
+# Red data directory and sink channels, so it needs no bot and nothing is fetched from or posted to the outside.
+
+# entries in every fixture feed, the newest NEW_ENTRIES of them only show up after the first round
+FIXTURE_ENTRIES = 50
+NEW_ENTRIES = 5
+# publish time of the newest fixture entry, older entries are an hour apart
+FIXTURE_TIME = 1600000000
+
+ROUNDS = ["subscribe", "new entries", "not modified"]
+STAGES = ["wait", "fetch", "parse", "enrich", "template", "config write"]
+
+LOREM = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore. "
+
+
+def _entry_time(index: int):
+    return FIXTURE_TIME - index * 3600
+
+
+def _rss_fixture(indexes: list):
+    items = []
+    for i in indexes:
+        description = (
+            f"<p>{LOREM * 10}<b>Post {i}</b> <a href='https://example.com/posts/{i}'>read more</a></p>"
+            f"<p><img src='https://example.com/images/{i}.png'></p><ul><li>first</li><li>second</li></ul>"
+        )
+        items.append(
+            f"<item><title>Post {i}</title><link>https://example.com/posts/{i}</link>"
+            f"<guid>https://example.com/posts/{i}</guid>"
+            f"<pubDate>{email.utils.formatdate(_entry_time(i), usegmt=True)}</pubDate>"
+            f"<category>news</category><category>release</category>"
+            f"<description>{escape(description)}</description></item>"
+        )
+    return (
+        "<?xml version='1.0' encoding='UTF-8'?><rss version='2.0'><channel><title>Example blog</title>"
+        f"<link>https://example.com/</link><description>Posts</description>{''.join(items)}</channel></rss>"
+    )
+
+
+def _atom_fixture(indexes: list):
+    entries = []
+    for i in indexes:
+        content = f"<p>{LOREM * 15}</p><p><img src='https://example.com/images/{i}.jpg'> <i>Entry {i}</i></p>"
+        updated = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(_entry_time(i)))
+        entries.append(
+            f"<entry><title>Entry {i}</title><link href='https://example.com/entries/{i}'/>"
+            f"<id>https://example.com/entries/{i}</id><updated>{updated}</updated>"
+            f"<author><name>Author {i % 3}</name></author>"
+            f"<content type='html'>{escape(content)}</content></entry>"
+        )
+    return (
+        "<?xml version='1.0' encoding='UTF-8'?><feed xmlns='http://www.w3.org/2005/Atom'>"
+        "<title>Example atom feed</title><id>https://example.com/atom</id>"
+        f"<updated>{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(FIXTURE_TIME))}</updated>{''.join(entries)}</feed>"
+    )
+
+
+def _youtube_fixture(indexes: list):
+    entries = []
+    for i in indexes:
+        published = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(_entry_time(i)))
+        entries.append(
+            f"<entry><id>yt:video:video{i}</id><yt:videoId>video{i}</yt:videoId>"
+            f"<yt:channelId>channel</yt:channelId><title>Video {i}</title>"
+            f"<link rel='alternate' href='https://www.youtube.com/watch?v=video{i}'/>"
+            f"<author><name>Example channel</name><uri>https://www.youtube.com/channel/channel</uri></author>"
+            f"<published>{published}</published><updated>{published}</updated>"
+            f"<media:group><media:title>Video {i}</media:title>"
+            f"<media:content url='https://www.youtube.com/v/video{i}' type='application/x-shockwave-flash' width='640' height='390'/>"
+            f"<media:thumbnail url='https://i.ytimg.com/vi/video{i}/hqdefault.jpg' width='480' height='360'/>"
+            f"<media:description>{LOREM * 3}</media:description>"
+            f"<media:community><media:starRating count='{i * 7}' average='5.00' min='1' max='5'/></media:community>"
+            f"</media:group></entry>"
+        )
+    return (
+        "<?xml version='1.0' encoding='UTF-8'?><feed xmlns:yt='http://www.youtube.com/xml/schemas/2015' "
+        "xmlns:media='http://search.yahoo.com/mrss/' xmlns='http://www.w3.org/2005/Atom'>"
+        "<title>Example channel</title><link rel='alternate' href='https://www.youtube.com/channel/channel'/>"
+        f"{''.join(entries)}</feed>"
+    )
+
+
+def _status_page_fixture(indexes: list):
+    items = []
+    for i in indexes:
+        updates = "".join(
+            f"<p><small>Update {n}</small><br><strong>{state}</strong> - {LOREM * 2}</p>"
+            for n, state in enumerate(["Resolved", "Monitoring", "Identified", "Investigating"])
+        )
+        items.append(
+            f"<item><title>Incident {i}: degraded performance</title>"
+            f"<link>https://status.example.com/incidents/{i}</link><guid>https://status.example.com/incidents/{i}</guid>"
+            f"<pubDate>{email.utils.formatdate(_entry_time(i), usegmt=True)}</pubDate>"
+            f"<description>{escape(updates)}</description></item>"
+        )
+    return (
+        "<?xml version='1.0' encoding='UTF-8'?><rss version='2.0'><channel><title>Example status</title>"
+        f"<link>https://status.example.com/</link><description>Incidents</description>{''.join(items)}</channel></rss>"
+    )
+
+
+# path: SimpleNamespace(build=fixture function, template=feed template, status=response status)
+FIXTURES = {
+    "/rss": SimpleNamespace(build=_rss_fixture, template="$title\n$link\n$description_plaintext", status=200),
+    "/atom": SimpleNamespace(build=_atom_fixture, template="$title\n$link\n$content_plaintext", status=200),
+    "/youtube": SimpleNamespace(
+        build=_youtube_fixture, template="$author_plaintext\n$title\n$link\n$media_thumbnail_plaintext", status=200
+    ),
+    "/status": SimpleNamespace(build=_status_page_fixture, template="$title\n$summary_plaintext", status=200),
+    "/error": SimpleNamespace(build=_rss_fixture, template="$title\n$link", status=503),
+}
+
+
+class FixtureServer():
+    """Serves the fixture feeds on localhost with a simulated latency, conditional requests and errors."""
+
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+        self.new_entries = False
+        self._runner = None
+        # path: (body without the new entries, body with them)
+        self._bodies = {}
+        for path, fixture in FIXTURES.items():
+            self._bodies[path] = (
+                fixture.build(range(NEW_ENTRIES, FIXTURE_ENTRIES)).encode(),
+                fixture.build(range(FIXTURE_ENTRIES)).encode(),
+            )
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{fixture}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle(self, request):
+        if request.path not in FIXTURES:
+            return web.Response(status=404)
+        await asyncio.sleep(self.latency)
+        if FIXTURES[request.path].status != 200:
+            return web.Response(status=FIXTURES[request.path].status)
+        body = self._bodies[request.path][self.new_entries]
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if request.headers.get("If-None-Match", None) == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, headers={"ETag": etag, "Content-Type": "application/xml"})
+
+
+class SinkChannel():
+    """Stand-in for a text channel that collects what is sent to it."""
+
+    def __init__(self, channel_id: int, name: str):
+        self.id = channel_id
+        self.name = name
+        self.mention = f"#{name}"
+        self.guild = SimpleNamespace(me=None)
+        self.sent = []
+
+    def permissions_for(self, member):
+        return SimpleNamespace(embed_links=True, send_messages=True)
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content or kwargs)
+
+
+class SinkBot():
+    """Stand-in for the bot with the parts that the feed pipeline uses."""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.channels = {}
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id, None)
+
+    async def embed_requested(self, *args, **kwargs):
+        return True
+
+    async def cog_disabled_in_guild(self, cog, guild):
+        return False
+
+    def dispatch(self, event_name, *args, **kwargs):
+        pass
+
+
+class StageTimer():
+    """Adds up the time spent in each pipeline stage of the current round and fixture."""
+
+    def __init__(self):
+        self.current = None
+        # (round, fixture): {stage: seconds, "bytes": downloaded bytes, "posted": sent messages}
+        self.results = {}
+
+    def add(self, stage: str, amount: float):
+        row = self.results.setdefault(self.current, dict.fromkeys(STAGES + ["bytes", "posted"], 0))
+        row[stage] += amount
+
+    def wrap(self, stage: str, func):
+        if asyncio.iscoroutinefunction(func):
+
+            async def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.add(stage, time.perf_counter() - start)
+
+        else:
+
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add(stage, time.perf_counter() - start)
+
+        return timed
+
+
+async def _get_benchmark_instance(settings: SimpleNamespace, timer: StageTimer):
+    """Makes a cog instance with a sink bot, timing the pipeline stages."""
+    bench = RSS(SinkBot())
+    bench._session = aiohttp.ClientSession(headers=bench._headers, timeout=bench._timeout, auto_decompress=False)
+    bench._set_parser_pool(settings.parser_workers, settings.parser_processes)
+    # every fixture is on the same host, the time spent waiting for its request rate limit is its own stage
+    bench._host_rate = settings.host_rate
+    bench._wait_for_host = timer.wrap("wait", bench._wait_for_host)
+
+    get_url_content = bench._get_url_content
+
+    async def fetch(url, validators=None):
+        html, error_msg = await get_url_content(url, validators)
+        if isinstance(html, bytes):
+            timer.add("bytes", len(html))
+        return html, error_msg
+
+    bench._get_url_content = timer.wrap("fetch", fetch)
+    # the parse time is the fetch and parse time with the fetch time taken out when reported
+    bench._fetch_feedparser_object = timer.wrap("parse", bench._fetch_feedparser_object)
+    bench._add_to_feedparser_object = timer.wrap("enrich", bench._add_to_feedparser_object)
+    bench._fill_template = timer.wrap("template", bench._fill_template)
+    bench._save_feed_states = timer.wrap("config write", bench._save_feed_states)
+    return bench
+
+
+async def _run_rounds(settings: SimpleNamespace, server: FixtureServer, base_url: str):
+    """Checks every fixture feed once per round with a fresh benchmark instance, returns its StageTimer."""
+    timer = StageTimer()
+    bench = await _get_benchmark_instance(settings, timer)
+    channels = {}
+    try:
+        for channel_id, path in enumerate(FIXTURES, 1):
+            url = base_url + path
+            channel = SinkChannel(channel_id, path.strip("/"))
+            channels[url] = channel
+            bench.bot.channels[channel_id] = channel
+            feed = RssFeed(name=channel.name, template=FIXTURES[path].template, url=url).to_json()
+            # saved like a feed that was never checked, so the first round only learns the current entries
+            feed.pop("seen")
+            await bench.config.channel(channel).feeds.set_raw(channel.name, value=feed)
+            bench._add_subscription(channel, channel.name, url)
+
+        for round_name in ROUNDS:
+            server.new_entries = round_name != "subscribe"
+            for url, channel in channels.items():
+                timer.current = (round_name, channel.name)
+                subscriptions = await bench._get_subscriptions(url)
+                await bench.get_current_feeds(url, subscriptions)
+                if channel.id in bench._post_senders:
+                    # posts are sent in the background, they count for the round that queued them
+                    await bench._post_senders[channel.id]
+                await bench._save_feed_states()
+                timer.add("posted", len(channel.sent))
+                channel.sent.clear()
+    finally:
+        await bench.config.clear_all()
+        bench._set_parser_pool(0)
+        await bench._session.close()
+    return timer
+
+
+async def run_benchmark(settings: SimpleNamespace):
+    """
+    Checks every fixture feed once per round: right after subscribing, once new entries were
+    published, and once more without changes.
+
+    settings has the latency of the fixture server in seconds, and the parser_workers, parser_processes
+    and host_rate settings of the cog.
+    The rounds run twice, memory tracing slows everything down so it's only on for the second run.
+    Returns a list of result dicts with the time of each stage in seconds, and the peak traced memory in bytes.
+    """
+    server = FixtureServer(settings.latency)
+    base_url = await server.start()
+    try:
+        timer = await _run_rounds(settings, server, base_url)
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        try:
+            await _run_rounds(settings, server, base_url)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+    finally:
+        await server.stop()
+
+    results = []
+    for (round_name, fixture), row in timer.results.items():
+        row["parse"] -= row["fetch"]
+        row["fetch"] -= row["wait"]
+        results.append({"round": round_name, "fixture": fixture, **row})
+    return results, peak_memory
+
+
+def format_results(results: list, peak_memory: int):
+    """Makes a table of the benchmark results, times are in milliseconds."""
+    msg = f"{'round':<13}{'feed':<9}{'size':>6}{'wait':>7}{'fetch':>7}{'parse':>7}{'enrich':>7}{'tmpl':>6}{'write':>7}{'posts':>6}\n"
+    for row in results:
+        msg += (
+            f"{row['round']:<13}{row['fixture']:<9}{row['bytes'] / 1024:>5.0f}K{row['wait'] * 1000:>7.1f}"
+            f"{row['fetch'] * 1000:>7.1f}{row['parse'] * 1000:>7.1f}{row['enrich'] * 1000:>7.1f}"
+            f"{row['template'] * 1000:>6.1f}{row['config write'] * 1000:>7.1f}{row['posted']:>6}\n"
+        )
+    msg += f"\nPeak traced memory: {peak_memory / 1024 / 1024:.1f} MiB"
+    return msg
+
+
+def _use_throwaway_data_path(data_path: str):
+    """Points Red's data manager at an empty data directory with the JSON storage, so no bot instance is needed."""
+    data_manager.basic_config = dict(data_manager.basic_config_default)
+    data_manager.basic_config["DATA_PATH"] = data_path
+    data_manager.basic_config["STORAGE_TYPE"] = "JSON"
+    data_manager.basic_config["STORAGE_DETAILS"] = {}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m rss.benchmark",
+        description=(
+            "Time the feed pipeline with built-in test feeds. The test feeds are served from a local web server and "
+            "checked three times: right after subscribing, with new entries and without changes. The wait column is "
+            "the time spent waiting for the request rate limit of the test feeds' website. Times are in milliseconds."
+        ),
+    )
+    parser.add_argument("--latency-ms", type=int, default=0, help="response latency of the test feed server")
+    parser.add_argument("--parser-workers", type=int, default=2, help="size of the feed parser pool, 0 parses inline")
+    parser.add_argument("--parser-processes", action="store_true", help="parse feeds in processes instead of threads")
+    parser.add_argument(
+        "--host-rate", type=float, default=HOST_REQUESTS_PER_SECOND, help="requests per second to the test feed server"
+    )
+    args = parser.parse_args()
+    settings = SimpleNamespace(
+        latency=max(args.latency_ms, 0) / 1000,
+        parser_workers=args.parser_workers,
+        parser_processes=args.parser_processes,
+        host_rate=args.host_rate,
+    )
+    with tempfile.TemporaryDirectory() as data_path:
+        _use_throwaway_data_path(data_path)
+        results, peak_memory = asyncio.run(run_benchmark(settings))
+    print(format_results(results, peak_memory))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-from math import sqrt
 import discord
 import re
 import webcolors
@@ -35,9 +34,9 @@ _RGB_NAME_MAP = {webcolors.hex_to_rgb(hexcode): name for hexcode, name in webcol
 _RGB_NAME_MAP.update(_DISCORD_COLOURS)
 
 
-def _distance(point_a: tuple, point_b: tuple):
+def _squared_distance(point_a: tuple, point_b: tuple):
     """
-    Euclidean distance between two points using rgb values as the metric space.
+    Squared euclidean distance between two points using rgb values as the metric space.
     """
     # rgb values
     x1, y1, z1 = point_a
@@ -48,21 +47,62 @@ def _distance(point_a: tuple, point_b: tuple):
     dy = y1 - y2
     dz = z1 - z2
 
-    # final distance
-    return sqrt(dx**2 + dy**2 + dz**2)
+    # no square root, the order of the distances is the same
+    return dx**2 + dy**2 + dz**2
 
 def _linear_nearest_neighbour(all_points: list, pivot: tuple):
     """
-    Check distance against all points from the pivot and return the distance and nearest point.
+    Check distance against all points from the pivot and return (squared distance, index, point) of the nearest one.
+    Only used as the reference that the k-d tree search is tested against.
     """
-    best_dist = None
-    nearest = None
-    for point in all_points:
-        dist = _distance(point, pivot)
-        if best_dist is None or dist < best_dist:
-            best_dist = dist
-            nearest = point
-    return best_dist, nearest
+    best = None
+    for index, point in enumerate(all_points):
+        dist = _squared_distance(point, pivot)
+        if best is None or dist < best[0]:
+            best = (dist, index, point)
+    return best
+
+def _build_kd_tree(points: list, depth: int = 0):
+    """
+    Build a k-d tree from a list of (point, index) tuples, splitting on r, g and b in turn.
+    Nodes are (point, index, axis, left, right) tuples, an empty tree is None.
+    """
+    if not points:
+        return None
+    axis = depth % 3
+    points = sorted(points, key=lambda item: item[0][axis])
+    median = len(points) // 2
+    point, index = points[median]
+    return (
+        point,
+        index,
+        axis,
+        _build_kd_tree(points[:median], depth + 1),
+        _build_kd_tree(points[median + 1:], depth + 1),
+    )
+
+def _kd_nearest_neighbour(node: tuple, pivot: tuple, best: tuple = None):
+    """
+    Search the k-d tree for the point nearest to the pivot and return (squared distance, index, point).
+    Points at the same distance go to the lowest index, like a linear search in index order.
+    """
+    if node is None:
+        return best
+    point, index, axis, left, right = node
+    candidate = (_squared_distance(point, pivot), index, point)
+    if best is None or candidate[:2] < best[:2]:
+        best = candidate
+
+    diff = pivot[axis] - point[axis]
+    near, far = (left, right) if diff < 0 else (right, left)
+    best = _kd_nearest_neighbour(near, pivot, best)
+    # the other side of the split can only have a nearer point, or one as near with a lower index,
+    # if the split plane is not further away than the best point so far
+    if diff**2 <= best[0]:
+        best = _kd_nearest_neighbour(far, pivot, best)
+    return best
+
+_RGB_TREE = _build_kd_tree([(tuple(rgb), index) for index, rgb in enumerate(_RGB_NAME_MAP)])
 
 
 class Color:
@@ -104,8 +144,7 @@ class Color:
         hex_code = await self._hex_validator(hex_code)
         rgb_tuple = await self._hex_to_rgb(hex_code)
 
-        positions = list(_RGB_NAME_MAP.keys())
-        dist, nearest = _linear_nearest_neighbour(positions, rgb_tuple)
+        dist, index, nearest = _kd_nearest_neighbour(_RGB_TREE, tuple(rgb_tuple))
 
         return _RGB_NAME_MAP[nearest]
 
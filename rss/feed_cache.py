@@ -0,0 +1,62 @@
+import sqlite3
+import zlib
+from types import SimpleNamespace
+
+
+class FeedCache():
+    """
+    The last full response of each feed url, kept in a SQLite file so it's still there after a restart.
+
+    The connection is opened on first use and every method must be called from the same thread,
+    the cog runs them in a single thread executor.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            self._db = sqlite3.connect(str(self.path))
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS feeds ("
+                "url TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL)"
+            )
+        return self._db
+
+    def get(self, url: str):
+        """Returns SimpleNamespace(body, etag, last_modified, fetched_at) of a url, or None if it isn't cached."""
+        row = self._connect().execute(
+            "SELECT body, etag, last_modified, fetched_at FROM feeds WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched_at = row
+        return SimpleNamespace(
+            body=zlib.decompress(body), etag=etag, last_modified=last_modified, fetched_at=fetched_at
+        )
+
+    def set(self, url: str, body: bytes, etag: str, last_modified: str, fetched_at: float):
+        db = self._connect()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?)",
+                (url, zlib.compress(body), etag, last_modified, fetched_at),
+            )
+
+    def delete(self, url: str):
+        db = self._connect()
+        with db:
+            db.execute("DELETE FROM feeds WHERE url = ?", (url,))
+
+    def prune(self, fetched_before: float):
+        """Deletes the responses fetched before a timestamp, returns how many were deleted."""
+        db = self._connect()
+        with db:
+            return db.execute("DELETE FROM feeds WHERE fetched_at < ?", (fetched_before,)).rowcount
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
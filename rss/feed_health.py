@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+
+# requests that can be made to one host in a burst, and how fast that allowance refills per second by default
+HOST_REQUEST_BURST = 10
+HOST_REQUESTS_PER_SECOND = 2
+
+# consecutive failures after which a feed url is considered dead and is only probed once its backoff ran out
+FAILURE_THRESHOLD = 3
+# longest time between checks of a failing feed url, in seconds
+MAX_BACKOFF = 24 * 60 * 60
+
+
+class TokenBucket():
+    """Request rate limit for a single host."""
+
+    def __init__(self, rate: float = HOST_REQUESTS_PER_SECOND, capacity: int = HOST_REQUEST_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def is_full(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+    def set_rate(self, rate: float):
+        # the allowance that built up so far still counts at the old rate
+        self._refill()
+        self.rate = rate
+
+    def reserve(self):
+        """
+        Takes the next request slot of the host and returns how many seconds are left until it can be used.
+
+        The token is taken right away, so requests that reserve later queue up behind each other instead of racing.
+        """
+        self._refill()
+        self.tokens -= 1
+        return max(-self.tokens / self.rate, 0)
+
+    async def acquire(self):
+        """Waits until a request to the host is allowed."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class FeedHealth():
+    """
+    Failure state of a feed url.
+
+    closed: the feed works, or hasn't failed often enough yet to be skipped
+    open: the feed failed FAILURE_THRESHOLD times in a row and isn't checked until retry_at
+    half-open: the backoff of an open feed ran out, the next check is a probe that closes or reopens it
+    """
+
+    def __init__(self):
+        self.failures = 0
+        self.last_error = None
+        self.last_failure = None
+        self.last_success = None
+        self.retry_at = 0
+
+    @property
+    def state(self):
+        if self.failures < FAILURE_THRESHOLD:
+            return "closed"
+        if time.time() < self.retry_at:
+            return "open"
+        return "half-open"
+
+    def record_success(self):
+        self.failures = 0
+        self.last_error = None
+        self.last_success = time.time()
+        self.retry_at = 0
+
+    def record_failure(self, error: str, interval: float):
+        """Counts a failed check and backs off exponentially from the feed's normal check interval."""
+        self.failures += 1
+        self.last_error = error
+        self.last_failure = time.time()
+        self.retry_at = self.last_failure + min(interval * 2 ** self.failures, MAX_BACKOFF)
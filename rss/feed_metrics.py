@@ -0,0 +1,41 @@
+class FeedMetrics():
+    """Numbers from the recent scheduled checks of a feed url, for [p]rss stats and listeners."""
+
+    def __init__(self):
+        # seconds from sending the request to having the whole response, of the last request
+        self.fetch_latency = None
+        # bytes of the last full (not 304) response
+        self.size = 0
+        # bytes downloaded since the cog was loaded
+        self.downloaded = 0
+        # seconds spent parsing the last full response and adding tags to its new entries
+        self.parse_time = None
+        self.enrich_time = 0
+        # entries in the last full response, and entries posted since the cog was loaded
+        self.entries = 0
+        self.posted = 0
+        # seconds between the check being due and a worker starting it, of the last check
+        self.queue_lag = None
+        self.checks = 0
+        self.last_check = None
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class HostMetrics():
+    """Totals of the requests made to a host for scheduled checks since the cog was loaded."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.downloaded = 0
+        # seconds, summed over every request
+        self.latency = 0
+
+    @property
+    def average_latency(self):
+        return self.latency / self.requests if self.requests else 0
+
+    def to_dict(self):
+        return {**vars(self), "average_latency": self.average_latency}
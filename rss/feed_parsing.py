@@ -0,0 +1,250 @@
+import datetime
+import re
+import time
+from urllib.parse import urlparse
+
+import feedparser
+from bs4 import BeautifulSoup
+
+from redbot.core.utils.chat_formatting import escape, humanize_list
+
+from .tag_type import INTERNAL_TAGS, TagType
+
+# These functions are used from the RSS cog's parser pool, so they must stay
+# importable module-level functions that only take and return picklable objects.
+
+
+def parse_feed(html: bytes):
+    """Parse a feed response into a feedparser object."""
+    feedparser_obj = feedparser.parse(html)
+    if feedparser_obj.bozo:
+        # parser exceptions aren't always picklable
+        feedparser_obj["bozo_exception"] = str(feedparser_obj.bozo_exception)
+    return feedparser_obj
+
+
+def add_to_feedparser_object(feedparser_obj: feedparser.util.FeedParserDict, needed: set = None):
+    """
+    Input: A feedparser object, optionally the set of tag names that will be used from it
+    Process: Append custom tags to the object from the custom formatters
+    Output: A feedparser object with additional attributes
+    """
+    feedparser_plus_obj = append_bs4_tags(feedparser_obj, needed)
+    if needed is None:
+        feedparser_plus_obj["template_tags"] = sorted(feedparser_plus_obj.keys())
+
+    return feedparser_plus_obj
+
+
+def add_content_images(bs4_soup: BeautifulSoup, rss_object: feedparser.util.FeedParserDict):
+    """
+    $content_images should always be marked as a special tag as the tags will
+    be dynamically generated based on the content included in the latest post.
+    """
+    content_images = bs4_soup.find_all("img")
+    if content_images:
+        for i, image in enumerate(content_images):
+            tag_name = f"content_image{str(i + 1).zfill(2)}"
+            try:
+                rss_object[tag_name] = image["src"]
+                rss_object["is_special"].append(tag_name)
+            except KeyError:
+                pass
+    return rss_object
+
+
+def add_generic_html_plaintext(bs4_soup: BeautifulSoup):
+    """
+    Bs4's .text attribute on a soup strips newlines and spaces
+    This provides newlines and more readable content.
+    """
+    text = ""
+    for element in bs4_soup.descendants:
+        if isinstance(element, str):
+            text += element
+        elif element.name == "br" or element.name == "p" or element.name == "li":
+            text += "\n"
+    text = re.sub("\\n+", "\n", text)
+    text = text.replace("*", "\\*")
+    text = text.replace("SC_OFF", "").replace("SC_ON", "\n")
+    text = text.replace("[link]", "").replace("[comments]", "")
+
+    return escape(text)
+
+
+def append_bs4_tags(rss_object: feedparser.util.FeedParserDict, needed: set = None):
+    """
+    Append bs4-discovered tags to an rss_feed/feedparser object.
+
+    If a set of needed tag names is given, only the tags in it are built instead of every possible tag.
+    """
+    rss_object["is_special"] = []
+    soup = None
+    image_soup = None
+    image_tag_name = None
+
+    tag_items = [(tag_name, tag_content) for tag_name, tag_content in rss_object.items() if tag_name not in INTERNAL_TAGS]
+    if needed is not None:
+        if any(tag_name.startswith("content_image") for tag_name in needed):
+            # content images are scraped from the last html tag
+            for tag_name, tag_content in reversed(tag_items):
+                if get_tag_content_type(tag_content) == TagType.HTML:
+                    image_tag_name = tag_name
+                    break
+        tag_items = [
+            (tag_name, tag_content)
+            for tag_name, tag_content in tag_items
+            if tag_name == image_tag_name or _builds_needed_tags(tag_name, tag_content, needed)
+        ]
+
+    for tag_name, tag_content in tag_items:
+        tag_content_check = get_tag_content_type(tag_content)
+
+        if tag_content_check == TagType.HTML:
+            # this is a tag that is only html content
+            try:
+                soup = BeautifulSoup(tag_content, "html.parser")
+            except TypeError:
+                pass
+
+            # this is a standard html format summary_detail tag
+            # the tag was determined to be html through the type attrib that
+            # was attached from the feed publisher but it's really a dict.
+            try:
+                soup = BeautifulSoup(tag_content["value"], "html.parser")
+            except (KeyError, TypeError):
+                pass
+
+            # this is a standard html format content or summary tag
+            try:
+                soup = BeautifulSoup(tag_content[0]["value"], "html.parser")
+            except (KeyError, TypeError):
+                pass
+
+            if soup and (needed is None or f"{tag_name}_plaintext" in needed):
+                rss_object[f"{tag_name}_plaintext"] = add_generic_html_plaintext(soup)
+            if needed is None or tag_name == image_tag_name:
+                image_soup = soup
+
+        if tag_content_check == TagType.LIST:
+            tags_list = []
+            tags_content_counter = 0
+
+            for list_item in tag_content:
+                list_item_check = get_tag_content_type(list_item)
+
+                # for common "links" format or when "content" is a list
+                list_html_content_counter = 0
+                if list_item_check == TagType.HTML:
+                    list_tags = ["value", "href"]
+                    for tag in list_tags:
+                        try:
+                            url_check = is_url(list_item[tag])
+                            if not url_check:
+                                # bs4 will cry if you try to give it a url to parse, so let's only
+                                # parse non-url content
+                                tag_content = BeautifulSoup(list_item[tag], "html.parser")
+                                tag_content = add_generic_html_plaintext(tag_content)
+                            else:
+                                tag_content = list_item[tag]
+                            list_html_content_counter += 1
+                            name = f"{tag_name}_plaintext{str(list_html_content_counter).zfill(2)}"
+                            rss_object[name] = tag_content
+                            rss_object["is_special"].append(name)
+                        except (KeyError, TypeError):
+                            pass
+
+                if list_item_check == TagType.DICT:
+                    authors_content_counter = 0
+
+                    # common "authors" tag format
+                    try:
+                        authors_content_counter += 1
+                        name = f"{tag_name}_plaintext{str(authors_content_counter).zfill(2)}"
+                        tag_content = BeautifulSoup(list_item["name"], "html.parser")
+                        rss_object[name] = tag_content.get_text()
+                        rss_object["is_special"].append(name)
+                    except KeyError:
+                        pass
+
+                    # common "tags" tag format
+                    try:
+                        tag = list_item["term"]
+                        tags_content_counter += 1
+                        name = f"{tag_name}_plaintext{str(tags_content_counter).zfill(2)}"
+                        rss_object[name] = tag
+                        rss_object["is_special"].append(name)
+                        tags_list.append(tag)
+                    except KeyError:
+                        pass
+
+                if len(tags_list) > 0:
+                    rss_object["tags_list"] = tags_list
+                    rss_object["tags_plaintext_list"] = humanize_list(tags_list)
+                    rss_object["is_special"].append("tags_list")
+                    rss_object["is_special"].append("tags_plaintext_list")
+
+    # if media_thumbnail or media_content exists, return the first friendly url
+    try:
+        rss_object["media_content_plaintext"] = rss_object["media_content"][0]["url"]
+        rss_object["is_special"].append("media_content_plaintext")
+    except KeyError:
+        pass
+    try:
+        rss_object["media_thumbnail_plaintext"] = rss_object["media_thumbnail"][0]["url"]
+        rss_object["is_special"].append("media_thumbnail_plaintext")
+    except KeyError:
+        pass
+
+    # change published_parsed and updated_parsed into a datetime object for embed footers
+    for time_tag in ["updated_parsed", "published_parsed"]:
+        try:
+            if isinstance(rss_object[time_tag], time.struct_time):
+                rss_object[f"{time_tag}_datetime"] = datetime.datetime(*rss_object[time_tag][:6])
+        except KeyError:
+            pass
+
+    if image_soup:
+        rss_object = add_content_images(image_soup, rss_object)
+
+    # add special tag/special site formatter here if needed in the future
+
+    return rss_object
+
+
+def _builds_needed_tags(tag_name: str, tag_content, needed: set):
+    """Check if any of the needed tags is built from this feed tag."""
+    if any(needed_tag.startswith(f"{tag_name}_plaintext") for needed_tag in needed):
+        return True
+    # tags_list can be built from any list of "term" dicts
+    return isinstance(tag_content, list) and ("tags_list" in needed or "tags_plaintext_list" in needed)
+
+
+def get_tag_content_type(tag_content):
+    """
+    Tag content type can be:
+        str, list, dict (FeedParserDict), bool, datetime.datetime object or time.struct_time
+    """
+    try:
+        if tag_content["type"] == "text/html":
+            return TagType(2)
+    except (KeyError, TypeError):
+        html_tags = ["<a>", "<a href", "<img", "<p>", "<b>", "</li>", "</ul>"]
+        if any(word in str(tag_content) for word in html_tags):
+            return TagType(2)
+
+    if isinstance(tag_content, dict):
+        return TagType(3)
+    elif isinstance(tag_content, list):
+        return TagType(4)
+    else:
+        return TagType(1)
+
+
+def is_url(url: str):
+    """Check that a string looks like a full url, without requesting it."""
+    try:
+        result = urlparse(url)
+    except Exception:
+        return False
+    return all([result.scheme, result.netloc, result.path])
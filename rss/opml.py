@@ -0,0 +1,40 @@
+import time
+import xml.etree.ElementTree as ET
+
+
+class OPMLError(Exception):
+    pass
+
+
+def parse_opml(data: bytes):
+    """
+    Reads the feeds from an OPML file, including feeds nested in folder outlines.
+
+    Returns a list of (title, url) tuples, the title is None if the outline has none.
+    """
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError as e:
+        raise OPMLError(f"The file isn't valid OPML: {e}")
+    if root.tag != "opml":
+        raise OPMLError("The file isn't an OPML file.")
+
+    feeds = []
+    for outline in root.iter("outline"):
+        url = outline.get("xmlUrl", "").strip()
+        if url:
+            title = outline.get("text", None) or outline.get("title", None)
+            feeds.append((title, url))
+    return feeds
+
+
+def build_opml(title: str, feeds: list):
+    """Writes an OPML file from a list of (title, url) tuples."""
+    root = ET.Element("opml", version="2.0")
+    head = ET.SubElement(root, "head")
+    ET.SubElement(head, "title").text = title
+    ET.SubElement(head, "dateCreated").text = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime())
+    body = ET.SubElement(root, "body")
+    for feed_title, url in feeds:
+        ET.SubElement(body, "outline", type="rss", text=feed_title, title=feed_title, xmlUrl=url)
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
@@ -8,6 +8,43 @@ class QuietTemplate(Template):
     https://github.com/python/cpython/blob/919f0bc8c904d3aa13eedb2dd1fe9c6b0555a591/Lib/string.py#L123
     """
 
+    def __init__(self, template):
+        super().__init__(template)
+        # the template is matched once and kept as (text, tag name or None) pairs for quiet_render
+        self._parts = []
+        last_end = 0
+        for mo in self.pattern.finditer(self.template):
+            text = self.template[last_end:mo.start()]
+            named = mo.group('named') or mo.group('braced')
+            if named is not None:
+                self._parts.append((text, named))
+            elif mo.group('escaped') is not None:
+                self._parts.append((text + self.delimiter, None))
+            elif mo.group('invalid') is not None:
+                self._parts.append((text + mo.group(), None))
+            else:
+                raise ValueError('Unrecognized named group in pattern', self.pattern)
+            last_end = mo.end()
+        self._parts.append((self.template[last_end:], None))
+        self.tag_names = frozenset(named for text, named in self._parts if named is not None)
+
+    def get_tag_names(self):
+        """Returns the set of tag names used in the template."""
+        return set(self.tag_names)
+
+    def quiet_render(self, values: dict):
+        """
+        Same output as quiet_safe_substitute, from a flat dict of tag name: value
+        that only needs to hold the tags in tag_names.
+        """
+        output = []
+        for text, named in self._parts:
+            output.append(text)
+            # invalid tags are left out of the feed output
+            if named is not None and named in values:
+                output.append(str(values[named]))
+        return "".join(output)
+
     def quiet_safe_substitute(self, mapping={}, /, **kws):
         if mapping is {}:
             mapping = kws
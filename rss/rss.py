@@ -1,31 +1,110 @@
 import asyncio
 import aiohttp
 from bs4 import BeautifulSoup
-import copy
-import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import discord
 import feedparser
+import hashlib
+import heapq
 import imghdr
 import io
 import logging
 import re
+import sqlite3
+import statistics
 import time
+import zlib
+from aiohttp import web
+from collections import deque
 from typing import Optional
 from types import MappingProxyType, SimpleNamespace
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse
 
-from redbot.core import checks, commands, Config
-from redbot.core.utils.chat_formatting import bold, box, escape, humanize_list, pagify
+from redbot.core import checks, commands, Config, data_manager
+from redbot.core.data_manager import cog_data_path
+from redbot.core.utils.chat_formatting import bold, box, pagify
 
+from . import feed_parsing
+from .cache import TTLCache
 from .color import Color
+from .feed_cache import FeedCache
+from .feed_health import HOST_REQUESTS_PER_SECOND, FeedHealth, TokenBucket
+from .feed_metrics import FeedMetrics, HostMetrics
+from .opml import OPMLError, build_opml, parse_opml
 from .quiet_template import QuietTemplate
 from .rss_feed import RssFeed
 from .tag_type import INTERNAL_TAGS, VALID_IMAGES, TagType
+from .websub import LEASE_SECONDS, WebSubSubscription, get_hub_links, verify_signature
 
 log = logging.getLogger("red.aikaterna.rss")
 
 
-__version__ = "1.5.0"
+__version__ = "1.6.0"
+
+# shared http client connection pool limits
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 4
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+# default bounds of the per-feed check interval, in seconds
+CHECK_INTERVAL = 300
+MAX_CHECK_INTERVAL = 3600
+# amount of recent entry timestamps kept per feed url to estimate how often it posts
+ARRIVAL_HISTORY = 10
+
+# amount of entry hashes kept per feed to tell new entries apart from posted ones,
+# feeds with more entries than this keep all of their current entries
+SEEN_ENTRY_LIMIT = 100
+
+# feeds and entries smaller than this many bytes are parsed on the event loop,
+# the handoff to the parser pool costs more than parsing them
+INLINE_PARSE_SIZE = 64 * 1024
+# how often changed feed states are saved to config
+FEED_STATE_SAVE_INTERVAL = 60
+
+# image type lookups for embed images and thumbnails: how many urls are remembered and for how long,
+# and how many bytes of an image are downloaded to find its type
+IMAGE_CACHE_SIZE = 1024
+IMAGE_CACHE_TTL = 6 * 60 * 60
+IMAGE_SNIFF_BYTES = 512
+
+# default largest feed response that is downloaded, in bytes after decompression, and the read size
+MAX_FEED_SIZE = 10 * 1024 * 1024
+FEED_READ_CHUNK_SIZE = 64 * 1024
+
+# messages waiting in a channel's post queue at which its feeds are skipped until the queue has caught up
+POST_QUEUE_LIMIT = 50
+# embeds sent together in one message, discord.py 1.x can only send one embed per message
+EMBEDS_PER_MESSAGE = 10 if discord.version_info.major >= 2 else 1
+EMBED_CHARACTERS_PER_MESSAGE = 6000
+
+# largest OPML file that rss import reads, and the longest feed name it makes from a feed title
+MAX_OPML_SIZE = 5 * 1024 * 1024
+IMPORT_FEED_NAME_LENGTH = 32
+
+# feed responses cached on disk: how old a response can be for rss force/listtags to use it instead of fetching,
+# and how long a response that isn't fetched again is kept
+RECENT_FEED_AGE = 5 * 60
+FEED_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
+# how often the feed schedule is rebuilt when the feed urls are split between several bot instances,
+# feeds added or removed on the other instances are only seen then
+SHARED_SCHEDULE_REFRESH_INTERVAL = 5 * 60
+
+# websub push mode: default address of the callback server, and how often subscriptions are renewed
+WEBSUB_HOST = "127.0.0.1"
+WEBSUB_PORT = 8080
+WEBSUB_RENEW_INTERVAL = 60 * 60
+
+# rss find: paths where sites often have a feed without advertising it, how long the search can take in total,
+# and how long it keeps waiting for other candidates once a feed was found
+FIND_FEED_PATHS = ["/feed", "/rss", "/feed.xml", "/rss.xml", "/atom.xml", "/index.xml", "/feeds/posts/default", "/?feed=rss2"]
+FIND_TIMEOUT = 15
+FIND_GRACE_PERIOD = 2
+
+# returned instead of the content when a conditional request gets a 304 answer
+NOT_MODIFIED = object()
 
 
 class RSS(commands.Cog):
@@ -36,37 +115,170 @@ class RSS(commands.Cog):
 
         self.config = Config.get_conf(self, 2761331001, force_registration=True)
         self.config.register_channel(feeds={})
-        self.config.register_global(use_published=["www.youtube.com"])
+        self.config.register_global(
+            use_published=["www.youtube.com"],
+            request_timeout=20,
+            connect_timeout=10,
+            concurrency=10,
+            min_check_interval=CHECK_INTERVAL,
+            max_check_interval=MAX_CHECK_INTERVAL,
+            parser_workers=2,
+            parser_processes=False,
+            max_feed_size=MAX_FEED_SIZE,
+            host_rate=HOST_REQUESTS_PER_SECOND,
+            worker_count=1,
+            worker_indexes={},
+            websub_enabled=False,
+            websub_url=None,
+            websub_host=WEBSUB_HOST,
+            websub_port=WEBSUB_PORT,
+            websub_subscriptions={},
+        )
 
-        self._post_queue = asyncio.PriorityQueue()
-        self._post_queue_size = None
+        # normalized feed url: list of SimpleNamespace(channel, feed_name), and (channel id, feed name): normalized feed url
+        self._feed_subscriptions = {}
+        self._subscription_urls = {}
+        # heap of (due timestamp, normalized feed url), entries not matching _next_check are stale
+        self._feed_schedule = []
+        self._next_check = {}
+        # normalized feed url: deque of recent entry timestamps
+        self._arrivals = {}
+        self._check_interval_bounds = (CHECK_INTERVAL, MAX_CHECK_INTERVAL)
+        # (index, count) of this bot instance among the instances that split the feed urls between them
+        self._worker = (0, 1)
+        self._check_queue = asyncio.Queue()
+        self._feed_workers = []
 
         self._read_feeds_loop = None
 
-        self._headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:83.0) Gecko/20100101 Firefox/83.0'}
-
-    def initialize(self):
+        self._headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:83.0) Gecko/20100101 Firefox/83.0',
+            # responses are decompressed by _read_limited, which only knows these
+            'Accept-Encoding': 'gzip, deflate',
+        }
+        self._session = None
+        self._parser_pool = None
+        # normalized feed url: {"etag": str, "last_modified": str} from the last full feed response
+        self._feed_validators = {}
+        # normalized feed url: FeedHealth of the scheduled checks
+        self._feed_health = {}
+        # host: TokenBucket shared by every request to it, host: number of scheduled feed urls on it
+        self._host_buckets = {}
+        self._host_url_counts = {}
+        self._host_rate = HOST_REQUESTS_PER_SECOND
+        # normalized feed urls whose next scheduled check already took a request slot of its host
+        self._reserved_checks = set()
+        # normalized feed url: FeedMetrics, host: HostMetrics, only for scheduled feeds
+        self._feed_metrics = {}
+        self._host_metrics = {}
+        # channel id: deque of (content, embed) waiting to be sent, and the task sending them
+        self._post_queues = {}
+        self._post_senders = {}
+        # websites from the use_published setting, read for every entry
+        self._use_published = set()
+        # (channel id, feed name): QuietTemplate of the feed's template
+        self._templates = {}
+        # image url: image type from imghdr or None
+        self._image_types = TTLCache(IMAGE_CACHE_SIZE, IMAGE_CACHE_TTL)
+        self._timeout = aiohttp.ClientTimeout(total=20, sock_connect=10)
+        self._max_feed_size = MAX_FEED_SIZE
+        # (channel id, feed name): last scraped state of the feed that may not be saved to config yet
+        self._feed_states = {}
+        # (channel id, feed name): keys of its state that changed since the last save
+        self._unsaved_feed_states = {}
+        # last full response of each normalized feed url on disk, only used from its own thread
+        self._feed_cache = None
+        self._feed_cache_executor = None
+        # normalized feed url: lock that makes the checks and the pushed content of a url post one at a time
+        self._url_locks = {}
+        # websub callback token: WebSubSubscription, and normalized feed url: websub callback token
+        self._websub = {}
+        self._websub_tokens = {}
+        # public base url of the websub callback server and its runner, while push mode is enabled
+        self._websub_url = None
+        self._websub_runner = None
+
+    async def initialize(self):
+        self._use_published = set(await self.config.use_published())
+        self._max_feed_size = await self.config.max_feed_size()
+        self._host_rate = await self.config.host_rate()
+        self._worker = await self._get_worker()
+        self._check_interval_bounds = (await self.config.min_check_interval(), await self.config.max_check_interval())
+        self._timeout = aiohttp.ClientTimeout(
+            total=await self.config.request_timeout(), sock_connect=await self.config.connect_timeout()
+        )
+        # one long-lived client for all feed traffic so that connections and dns lookups
+        # are reused between polls instead of paying the setup costs on every request
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        self._session = aiohttp.ClientSession(
+            headers=self._headers, connector=connector, timeout=self._timeout, auto_decompress=False
+        )
+        self._set_parser_pool(await self.config.parser_workers(), await self.config.parser_processes())
+        for sub_data in (await self.config.websub_subscriptions()).values():
+            sub = WebSubSubscription.from_json(sub_data)
+            self._websub[sub.token] = sub
+            self._websub_tokens[sub.url] = sub.token
+        if await self.config.websub_enabled():
+            error_msg = await self._start_websub_server()
+            if error_msg:
+                log.error(f"Push mode is enabled but the websub callback server can't start: {error_msg}")
+        self._feed_cache = FeedCache(cog_data_path(self) / "feed_cache.sqlite3")
+        self._feed_cache_executor = ThreadPoolExecutor(max_workers=1)
+        pruned = await self._run_in_feed_cache("prune", time.time() - FEED_CACHE_MAX_AGE)
+        if pruned:
+            log.debug(f"Removed {pruned} old feed responses from the feed cache")
         self._read_feeds_loop = self.bot.loop.create_task(self.read_feeds())
 
     def cog_unload(self):
         if self._read_feeds_loop:
             self._read_feeds_loop.cancel()
-
-    def _add_content_images(self, bs4_soup: BeautifulSoup, rss_object: feedparser.util.FeedParserDict):
-        """
-        $content_images should always be marked as a special tag as the tags will
-        be dynamically generated based on the content included in the latest post.
-        """
-        content_images = bs4_soup.find_all("img")
-        if content_images:
-            for i, image in enumerate(content_images):
-                tag_name = f"content_image{str(i + 1).zfill(2)}"
-                try:
-                    rss_object[tag_name] = image["src"]
-                    rss_object["is_special"].append(tag_name)
-                except KeyError:
-                    pass
-        return rss_object
+        self._set_feed_workers(0)
+        for sender in self._post_senders.values():
+            sender.cancel()
+        self.bot.loop.create_task(self._save_feed_states())
+        if self._session:
+            self.bot.loop.create_task(self._session.close())
+        if self._websub_runner:
+            self.bot.loop.create_task(self._websub_runner.cleanup())
+        self._set_parser_pool(0)
+        if self._feed_cache_executor:
+            # runs after the cache writes that are still waiting in the executor
+            self._feed_cache_executor.submit(self._feed_cache.close)
+            self._feed_cache_executor.shutdown(wait=False)
+
+    def _set_parser_pool(self, workers: int, processes: bool = False):
+        """Replaces the pool that feed parsing and tag cleanup run in, 0 workers parses on the event loop."""
+        old_pool = self._parser_pool
+        self._parser_pool = None
+        if workers > 0:
+            pool_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+            self._parser_pool = pool_class(max_workers=workers)
+        if old_pool:
+            # jobs already handed to the old pool still finish
+            old_pool.shutdown(wait=False)
+
+    async def _run_in_parser_pool(self, size: int, func, *args):
+        """Runs feed parsing work off the event loop, unless it's small enough to not block it."""
+        if size < INLINE_PARSE_SIZE or not self._parser_pool:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._parser_pool, func, *args)
+
+    async def _run_in_feed_cache(self, method: str, *args):
+        """Calls a FeedCache method in the feed cache thread, returns None if there is no cache or it fails."""
+        if not self._feed_cache_executor:
+            return None
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._feed_cache_executor, getattr(self._feed_cache, method), *args
+            )
+        except (sqlite3.Error, zlib.error) as e:
+            log.error("Failure using the feed cache", exc_info=e)
+            return None
 
     async def _add_feed(self, ctx, feed_name: str, channel: discord.TextChannel, url: str):
         """Helper for rss add."""
@@ -77,20 +289,12 @@ class RSS(commands.Cog):
                 await ctx.send("Couldn't fetch that feed: there were no feed objects found.")
                 return
 
-            # sort everything by time if a time value is present
-            if feedparser_obj.entries:
-                # this feed has posts
-                sorted_feed_by_post_time = await self._sort_by_post_time(feedparser_obj.entries)
-            else:
-                # this feed does not have posts, but it has a header with channel information
-                sorted_feed_by_post_time = [feedparser_obj.feed]
-
-            # add additional tags/images/clean html
-            feedparser_plus_obj = await self._add_to_feedparser_object(sorted_feed_by_post_time[0], url)
-            rss_object = await self._convert_feedparser_to_rssfeed(feed_name, feedparser_plus_obj, url)
+            rss_object = await self._make_rss_feed(feed_name, url, feedparser_obj)
 
             async with self.config.channel(channel).feeds() as feed_data:
                 feed_data[feed_name] = rss_object.to_json()
+            self._forget_feed_state(channel, feed_name)
+            self._add_subscription(channel, feed_name, url)
             msg = (
                 f"Feed `{feed_name}` added in channel: {channel.mention}\n"
                 f"List the template tags with `{ctx.prefix}rss listtags` "
@@ -101,143 +305,26 @@ class RSS(commands.Cog):
             await ctx.send(f"There is already an existing feed named {bold(feed_name)} in {channel.mention}.")
             return
 
-    def _add_generic_html_plaintext(self, bs4_soup: BeautifulSoup):
-        """
-        Bs4's .text attribute on a soup strips newlines and spaces
-        This provides newlines and more readable content.
-        """
-        text = ""
-        for element in bs4_soup.descendants:
-            if isinstance(element, str):
-                text += element
-            elif element.name == "br" or element.name == "p" or element.name == "li":
-                text += "\n"
-        text = re.sub("\\n+", "\n", text)
-        text = text.replace("*", "\\*")
-        text = text.replace("SC_OFF", "").replace("SC_ON", "\n")
-        text = text.replace("[link]", "").replace("[comments]", "")
-
-        return escape(text)
-
-    async def _append_bs4_tags(self, rss_object: feedparser.util.FeedParserDict, url: str):
-        """Append bs4-discovered tags to an rss_feed/feedparser object."""
-        rss_object["is_special"] = []
-        soup = None
-
-        temp_rss_obect = copy.deepcopy(rss_object)
-        for tag_name, tag_content in temp_rss_obect.items():
-            if tag_name in INTERNAL_TAGS:
-                continue
-
-            tag_content_check = await self._get_tag_content_type(tag_content)
-
-            if tag_content_check == TagType.HTML:
-                # this is a tag that is only html content
-                try:
-                    soup = BeautifulSoup(tag_content, "html.parser")
-                except TypeError:
-                    pass
-
-                # this is a standard html format summary_detail tag
-                # the tag was determined to be html through the type attrib that
-                # was attached from the feed publisher but it's really a dict.
-                try:
-                    soup = BeautifulSoup(tag_content["value"], "html.parser")
-                except (KeyError, TypeError):
-                    pass
-
-                # this is a standard html format content or summary tag
-                try:
-                    soup = BeautifulSoup(tag_content[0]["value"], "html.parser")
-                except (KeyError, TypeError):
-                    pass
-
-                if soup:
-                    rss_object[f"{tag_name}_plaintext"] = self._add_generic_html_plaintext(soup)
-
-            if tag_content_check == TagType.LIST:
-                tags_list = []
-                tags_content_counter = 0
-
-                for list_item in tag_content:
-                    list_item_check = await self._get_tag_content_type(list_item)
-
-                    # for common "links" format or when "content" is a list
-                    list_html_content_counter = 0
-                    if list_item_check == TagType.HTML:
-                        list_tags = ["value", "href"]
-                        for tag in list_tags:
-                            try:
-                                url_check = await self._valid_url(list_item[tag], feed_check=False)
-                                if not url_check:
-                                    # bs4 will cry if you try to give it a url to parse, so let's only
-                                    # parse non-url content
-                                    tag_content = BeautifulSoup(list_item[tag], "html.parser")
-                                    tag_content = self._add_generic_html_plaintext(tag_content)
-                                else:
-                                    tag_content = list_item[tag]
-                                list_html_content_counter += 1
-                                name = f"{tag_name}_plaintext{str(list_html_content_counter).zfill(2)}"
-                                rss_object[name] = tag_content
-                                rss_object["is_special"].append(name)
-                            except (KeyError, TypeError):
-                                pass
-
-                    if list_item_check == TagType.DICT:
-                        authors_content_counter = 0
-
-                        # common "authors" tag format
-                        try:
-                            authors_content_counter += 1
-                            name = f"{tag_name}_plaintext{str(authors_content_counter).zfill(2)}"
-                            tag_content = BeautifulSoup(list_item["name"], "html.parser")
-                            rss_object[name] = tag_content.get_text()
-                            rss_object["is_special"].append(name)
-                        except KeyError:
-                            pass
-
-                        # common "tags" tag format
-                        try:
-                            tag = list_item["term"]
-                            tags_content_counter += 1
-                            name = f"{tag_name}_plaintext{str(tags_content_counter).zfill(2)}"
-                            rss_object[name] = tag
-                            rss_object["is_special"].append(name)
-                            tags_list.append(tag)
-                        except KeyError:
-                            pass
-
-                    if len(tags_list) > 0:
-                        rss_object["tags_list"] = tags_list
-                        rss_object["tags_plaintext_list"] = humanize_list(tags_list)
-                        rss_object["is_special"].append("tags_list")
-                        rss_object["is_special"].append("tags_plaintext_list")
-
-        # if media_thumbnail or media_content exists, return the first friendly url
-        try:
-            rss_object["media_content_plaintext"] = rss_object["media_content"][0]["url"]
-            rss_object["is_special"].append("media_content_plaintext")
-        except KeyError:
-            pass
-        try:
-            rss_object["media_thumbnail_plaintext"] = rss_object["media_thumbnail"][0]["url"]
-            rss_object["is_special"].append("media_thumbnail_plaintext")
-        except KeyError:
-            pass
-
-        # change published_parsed and updated_parsed into a datetime object for embed footers
-        for time_tag in ["updated_parsed", "published_parsed"]:
-            try:
-                if isinstance(rss_object[time_tag], time.struct_time):
-                    rss_object[f"{time_tag}_datetime"] = datetime.datetime(*rss_object[time_tag][:6])
-            except KeyError:
-                pass
-
-        if soup:
-            rss_object = self._add_content_images(soup, rss_object)
+    async def _make_rss_feed(self, feed_name: str, url: str, feedparser_obj: feedparser.util.FeedParserDict):
+        """Helper for rss add/import, makes the RssFeed of a fetched feed."""
+        # sort everything by time if a time value is present
+        if feedparser_obj.entries:
+            # this feed has posts
+            sorted_feed_by_post_time = self._sort_by_post_time(feedparser_obj.entries)
+        else:
+            # this feed does not have posts, but it has a header with channel information
+            sorted_feed_by_post_time = [feedparser_obj.feed]
 
-        # add special tag/special site formatter here if needed in the future
+        self._discover_websub(url, feedparser_obj.feed)
 
+        # add additional tags/images/clean html
+        feedparser_plus_obj = await self._add_to_feedparser_object(sorted_feed_by_post_time[0], url)
+        rss_object = await self._convert_feedparser_to_rssfeed(feed_name, feedparser_plus_obj, url)
+        # everything currently in the feed counts as already posted
+        entry_hashes = [
+            self._get_entry_hash(entry, self._time_tag_validation(entry)) for entry in sorted_feed_by_post_time
+        ]
+        rss_object.seen = self._merge_seen_entries(entry_hashes, [])
         return rss_object
 
     async def _check_channel_permissions(self, ctx, channel: discord.TextChannel, addl_send_messages_check=True):
@@ -273,7 +360,9 @@ class RSS(commands.Cog):
         if rss_exists:
             async with self.config.channel(channel).feeds() as rss_data:
                 rss_data.pop(feed_name, None)
-                return True
+            self._forget_feed_state(channel, feed_name)
+            self._remove_subscription(channel.id, feed_name)
+            return True
         return False
 
     async def _edit_template(self, ctx, feed_name: str, channel: discord.TextChannel, template: str):
@@ -285,7 +374,8 @@ class RSS(commands.Cog):
                 if feed_name not in feed_data:
                     feed_data[feed_name] = {}
                 feed_data[feed_name]["template"] = template
-                return True
+            self._templates.pop((channel.id, feed_name), None)
+            return True
         return False
 
     @staticmethod
@@ -310,6 +400,12 @@ class RSS(commands.Cog):
 
         return website
 
+    @staticmethod
+    def _normalize_url(url: str):
+        """Helper for the feed loop, feeds sharing a normalized url are fetched once."""
+        result = urlparse(url.strip())
+        return result._replace(scheme=result.scheme.lower(), netloc=result.netloc.lower(), fragment="").geturl()
+
     async def _get_channel_object(self, channel_id: int):
         """Helper for rss feed loop."""
         channel = self.bot.get_channel(channel_id)
@@ -335,64 +431,192 @@ class RSS(commands.Cog):
             feed_list.append(f"{name}{space * extra_spacing}  {data['url']}")
         return feed_list
 
-    async def _get_tag_content_type(self, tag_content):
+    async def _get_url_content(self, url, validators: dict = None, *, log_errors: bool = True):
         """
-        Tag content type can be:
-            str, list, dict (FeedParserDict), bool, datetime.datetime object or time.struct_time
+        Helper for rss add/_valid_url.
+
+        If a validators dict is passed, the request is made conditional with its etag/last_modified
+        values and the dict is updated in place from the response headers.
+        A 304 response returns NOT_MODIFIED instead of the content.
+        Failed requests are only logged at debug level if log_errors is False.
         """
-        try:
-            if tag_content["type"] == "text/html":
-                return TagType(2)
-        except (KeyError, TypeError):
-            html_tags = ["<a>", "<a href", "<img", "<p>", "<b>", "</li>", "</ul>"]
-            if any(word in str(tag_content) for word in html_tags):
-                return TagType(2)
-
-        if isinstance(tag_content, dict):
-            return TagType(3)
-        elif isinstance(tag_content, list):
-            return TagType(4)
+        url_key = self._normalize_url(url)
+        if url_key in self._reserved_checks:
+            # a scheduled check, it waited for its request slot in the feed schedule instead of here
+            self._reserved_checks.discard(url_key)
         else:
-            return TagType(1)
-
-    async def _get_url_content(self, url):
-        """Helper for rss add/_valid_url."""
+            await self._wait_for_host(url)
+        start = time.perf_counter()
+        html, error_msg = await self._request_url_content(url, validators, log_errors=log_errors)
+        self._record_fetch(url, time.perf_counter() - start, html)
+        return html, error_msg
+
+    async def _request_url_content(self, url, validators: dict = None, *, log_errors: bool = True):
+        """Helper for _get_url_content."""
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        # failures of a feed that is already failing are expected, keep them out of the error log
+        health = self._feed_health.get(self._normalize_url(url), None)
+        log_level = logging.DEBUG if not log_errors or (health and health.failures) else logging.ERROR
         try:
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(headers=self._headers, timeout=timeout) as session:
-                async with session.get(url) as resp:
-                    html = await resp.read()
+            async with self._session.get(url, headers=headers, timeout=self._timeout) as resp:
+                if resp.status == 304:
+                    return NOT_MODIFIED, None
+                if resp.status >= 400:
+                    friendly_msg = f"The website returned an error: {resp.status} {resp.reason}"
+                    log.log(log_level, f"{resp.status} response from feed at url:\n\t{url}")
+                    return None, friendly_msg
+                html, friendly_msg = await self._read_limited(resp)
+                if friendly_msg:
+                    log.log(log_level, f"feed content not readable at url:\n\t{url}\n\t{friendly_msg}")
+                    return None, friendly_msg
+                if validators is not None:
+                    validators["etag"] = resp.headers.get("ETag", None)
+                    validators["last_modified"] = resp.headers.get("Last-Modified", None)
             return html, None
         except aiohttp.client_exceptions.ClientConnectorError:
             friendly_msg = "There was an OSError or the connection failed."
             msg = f"aiohttp failure accessing feed at url:\n\t{url}"
-            log.error(msg, exc_info=True)
+            log.log(log_level, msg, exc_info=True)
             return None, friendly_msg
         except aiohttp.client_exceptions.ClientPayloadError as e:
             friendly_msg = "The website closed the connection prematurely or the response was malformed.\n"
             friendly_msg += f"The error returned was: `{str(e)}`\n"
             friendly_msg += "For more technical information, check your bot's console or logs."
             msg = f"content error while reading feed at url:\n\t{url}"
-            log.error(msg, exc_info=True)
+            log.log(log_level, msg, exc_info=True)
             return None, friendly_msg
         except asyncio.exceptions.TimeoutError:
             friendly_msg = "The bot timed out while trying to access that content."
             msg = f"asyncio timeout while accessing feed at url:\n\t{url}"
-            log.error(msg, exc_info=True)
+            log.log(log_level, msg, exc_info=True)
             return None, friendly_msg
         except Exception:
             friendly_msg = "There was an unexpected error. Check your console for more information."
             msg = f"General failure accessing feed at url:\n\t{url}"
-            log.error(msg, exc_info=True)
+            log.log(log_level, msg, exc_info=True)
             return None, friendly_msg
 
-    async def _fetch_feedparser_object(self, url: str):
-        """Get a full feedparser object from a url: channel header + items."""
-        html, error_msg = await self._get_url_content(url)
+    async def _read_limited(self, resp: aiohttp.ClientResponse):
+        """
+        Helper for _request_url_content, reads a response body up to the feed size limit.
+
+        Compressed responses are decompressed while they are read, the limit applies to the decompressed size.
+        Returns the body and None, or None and an error message if the body is too large or can't be read.
+        """
+        too_large_msg = f"The feed is larger than the size limit of {self._max_feed_size / 1024 / 1024:.0f} MB."
+        # the length of a compressed body is only a lower bound, but it allows giving up without reading
+        if resp.content_length is not None and resp.content_length > self._max_feed_size:
+            # the connection still has the unread body on it, so it can't go back to the pool
+            resp.close()
+            return None, too_large_msg
+
+        content_encoding = resp.headers.get("Content-Encoding", "identity").strip().lower()
+        if content_encoding in ["gzip", "x-gzip", "deflate"]:
+            # detects gzip and zlib headers
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+        elif content_encoding == "identity":
+            decompressor = None
+        else:
+            resp.close()
+            return None, f"The feed was sent with an unsupported compression: `{content_encoding}`."
+
+        body = bytearray()
+        # compressed data read before anything was decompressed, it's decompressed again if it turns out to be raw deflate
+        compressed_start = bytearray()
+        try:
+            async for chunk in resp.content.iter_chunked(FEED_READ_CHUNK_SIZE):
+                if decompressor:
+                    if not body:
+                        compressed_start.extend(chunk)
+                    # never decompress more than what is left below the limit, so small compressed
+                    # chunks can't blow up in memory
+                    try:
+                        chunk = decompressor.decompress(chunk, self._max_feed_size + 1 - len(body))
+                    except zlib.error:
+                        if body or content_encoding != "deflate":
+                            raise
+                        # some servers send deflate without the zlib header, like aiohttp's own decoder allows
+                        content_encoding = "raw deflate"
+                        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                        chunk = decompressor.decompress(bytes(compressed_start), self._max_feed_size + 1)
+                body.extend(chunk)
+                if len(body) > self._max_feed_size:
+                    resp.close()
+                    return None, too_large_msg
+            if decompressor:
+                body.extend(decompressor.flush())
+                if len(body) > self._max_feed_size:
+                    return None, too_large_msg
+        except zlib.error as e:
+            resp.close()
+            return None, f"The feed's compressed content is malformed: `{e}`."
+        return bytes(body), None
+
+    async def _wait_for_host(self, url: str):
+        """Helper for _get_url_content, waits until the rate limit of a url's host allows a request."""
+        await self._get_host_bucket(url).acquire()
+
+    def _get_host_bucket(self, url: str):
+        """Gets the request rate limit of a url's host."""
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_buckets:
+            self._host_buckets[host] = TokenBucket()
+        # hosts with a lot of feeds get at least the rate that checks all of them once per minimum check interval,
+        # otherwise their feeds could never all be checked in time
+        rate = max(self._host_rate, self._host_url_counts.get(host, 0) / self._check_interval_bounds[0])
+        if self._host_buckets[host].rate != rate:
+            self._host_buckets[host].set_rate(rate)
+        return self._host_buckets[host]
+
+    async def _fetch_feedparser_object(self, url: str, validators: dict = None, cached_body: bytes = None):
+        """
+        Get a full feedparser object from a url: channel header + items.
+
+        Full responses are saved to the feed cache. If the cached body that the validators came from is passed,
+        a 304 response parses it instead of returning a not modified object.
+        """
+        if validators is None:
+            # only used to save the response's validators to the feed cache
+            validators = {}
+        html, error_msg = await self._get_url_content(url, validators)
+        if html is NOT_MODIFIED:
+            if cached_body is None:
+                return SimpleNamespace(entries=None, not_modified=True, url=url)
+            return await self._parse_feed_content(url, cached_body)
         if not html:
             return SimpleNamespace(entries=None, error=error_msg, url=url)
 
-        feedparser_obj = feedparser.parse(html)
+        feedparser_obj = await self._parse_feed_content(url, html)
+        if not getattr(feedparser_obj, "error", None):
+            await self._run_in_feed_cache(
+                "set",
+                self._normalize_url(url),
+                html,
+                validators.get("etag", None),
+                validators.get("last_modified", None),
+                time.time(),
+            )
+        return feedparser_obj
+
+    async def _fetch_recent_feedparser_object(self, url: str):
+        """Helper for rss force/listtags, uses the cached response of a url if it's recent instead of fetching it."""
+        cached = await self._run_in_feed_cache("get", self._normalize_url(url))
+        if cached and time.time() - cached.fetched_at < RECENT_FEED_AGE:
+            return await self._parse_feed_content(url, cached.body)
+        return await self._fetch_feedparser_object(url)
+
+    async def _parse_feed_content(self, url: str, html: bytes):
+        """Helper for _fetch_feedparser_object, parses a feed response."""
+        start = time.perf_counter()
+        feedparser_obj = await self._run_in_parser_pool(len(html), feed_parsing.parse_feed, html)
+        metrics = self._feed_metrics.get(self._normalize_url(url), None)
+        if metrics:
+            metrics.parse_time = time.perf_counter() - start
         if feedparser_obj.bozo:
             error_msg = f"Bozo feed: feedparser is unable to parse the response from {url}.\n"
             error_msg += f"Feedparser error message: `{feedparser_obj.bozo_exception}`"
@@ -400,15 +624,24 @@ class RSS(commands.Cog):
 
         return feedparser_obj
 
-    async def _add_to_feedparser_object(self, feedparser_obj: feedparser.util.FeedParserDict, url: str):
+    async def _add_to_feedparser_object(
+        self, feedparser_obj: feedparser.util.FeedParserDict, url: str, needed: set = None
+    ):
         """
-        Input: A feedparser object
+        Input: A feedparser object, optionally the set of tag names that will be used from it
         Process: Append custom tags to the object from the custom formatters
         Output: A feedparser object with additional attributes
         """
-        feedparser_plus_obj = await self._append_bs4_tags(feedparser_obj, url)
-        feedparser_plus_obj["template_tags"] = sorted(feedparser_plus_obj.keys())
-
+        # html-heavy entries are the expensive ones to clean up with bs4
+        size = len(str(feedparser_obj.get("summary", "")))
+        size += sum(len(str(content.get("value", ""))) for content in feedparser_obj.get("content", []))
+        start = time.perf_counter()
+        feedparser_plus_obj = await self._run_in_parser_pool(
+            size, feed_parsing.add_to_feedparser_object, feedparser_obj, needed
+        )
+        metrics = self._feed_metrics.get(self._normalize_url(url), None)
+        if metrics:
+            metrics.enrich_time += time.perf_counter() - start
         return feedparser_plus_obj
 
     async def _convert_feedparser_to_rssfeed(
@@ -418,7 +651,7 @@ class RSS(commands.Cog):
         Converts any feedparser/feedparser_plus object to an RssFeed object.
         Used in rss add when saving a new feed.
         """
-        entry_time = await self._time_tag_validation(feedparser_plus_obj)
+        entry_time = self._time_tag_validation(feedparser_plus_obj)
 
         rss_object = RssFeed(
             name=feed_name.lower(),
@@ -434,11 +667,10 @@ class RSS(commands.Cog):
 
         return rss_object
 
-    async def _sort_by_post_time(self, feedparser_obj: feedparser.util.FeedParserDict):
+    def _sort_by_post_time(self, feedparser_obj: feedparser.util.FeedParserDict):
         base_url = urlparse(feedparser_obj[0].get("link")).netloc
-        use_published_parsed_override = await self.config.use_published()
 
-        if base_url in use_published_parsed_override:
+        if base_url in self._use_published:
             time_tag = ["published_parsed"]
         else:
             time_tag = ["updated_parsed", "published_parsed"]
@@ -453,7 +685,7 @@ class RSS(commands.Cog):
 
         return sorted_feed_by_post_time
 
-    async def _time_tag_validation(self, entry: feedparser.util.FeedParserDict):
+    def _time_tag_validation(self, entry: feedparser.util.FeedParserDict):
         """Gets a unix timestamp if it's available from a single feedparser post entry."""
         feed_link = entry.get("link", None)
         if feed_link:
@@ -463,8 +695,7 @@ class RSS(commands.Cog):
 
         # check for a feed time override, if a feed is being problematic regarding updated_parsed
         # usage (i.e. a feed entry keeps reposting with no perceived change in content)
-        use_published_parsed_override = await self.config.use_published()
-        if base_url in use_published_parsed_override:
+        if base_url in self._use_published:
             entry_time = entry.get("published_parsed", None)
         else:
             entry_time = entry.get("updated_parsed", None)
@@ -485,23 +716,97 @@ class RSS(commands.Cog):
         final_words += [word if word in exceptions else word.capitalize() for word in lowercase_words[1:]]
         return " ".join(final_words)
 
-    async def _update_last_scraped(
+    @staticmethod
+    def _get_entry_hash(entry: feedparser.util.FeedParserDict, entry_time: int):
+        """
+        Gets a fixed width identity for a feed entry: its id, or its link and title if it has no id,
+        with its time so that updates of an existing post are new entries too.
+        """
+        identity = entry.get("id", None) or f"{entry.get('link', '')}\n{entry.get('title', '')}"
+        return hashlib.blake2b(f"{identity}\n{entry_time}".encode(), digest_size=8).hexdigest()
+
+    @staticmethod
+    def _merge_seen_entries(entry_hashes: list, seen: list):
+        """Keeps the entries currently in a feed and the most recent others, up to SEEN_ENTRY_LIMIT."""
+        current = set(entry_hashes)
+        merged = list(dict.fromkeys(entry_hashes)) + [entry_hash for entry_hash in seen if entry_hash not in current]
+        return merged[: max(SEEN_ENTRY_LIMIT, len(current))]
+
+    def _update_last_scraped(
         self,
         channel: discord.TextChannel,
         feed_name: str,
+        rss_feed: dict,
         current_feed_title: str,
         current_feed_link: str,
         current_feed_time: int,
+        validators: dict = None,
+        seen: list = None,
     ):
-        """Updates last title and last link seen for comparison on next feed pull."""
-        async with self.config.channel(channel).feeds() as feed_data:
-            try:
-                feed_data[feed_name]["last_title"] = current_feed_title
-                feed_data[feed_name]["last_link"] = current_feed_link
-                feed_data[feed_name]["last_time"] = current_feed_time
-            except KeyError:
-                # the feed was deleted during a _get_current_feed execution
-                pass
+        """
+        Updates last title, last link and the seen entries for comparison on next feed pull.
+
+        The new state is kept in memory and only saved to config by _save_feed_states.
+        """
+        state = {
+            "last_title": current_feed_title,
+            "last_link": current_feed_link,
+            "last_time": current_feed_time,
+        }
+        if validators is not None:
+            state["etag"] = validators["etag"]
+            state["last_modified"] = validators["last_modified"]
+        if seen is not None:
+            state["seen"] = seen
+        changed = {key for key, value in state.items() if rss_feed.get(key, None) != value}
+        if not changed:
+            return
+
+        feed_key = (channel.id, feed_name)
+        self._feed_states.setdefault(feed_key, {}).update(state)
+        self._unsaved_feed_states.setdefault(feed_key, set()).update(changed)
+
+    def _get_feed_state(self, channel: discord.TextChannel, feed_name: str, feed_data: dict):
+        """Adds the last scraped state that is not saved to config yet to a feed's saved data."""
+        state = self._feed_states.get((channel.id, feed_name), None)
+        if state:
+            feed_data = {**feed_data, **state}
+        return feed_data
+
+    def _forget_feed_state(self, channel: discord.TextChannel, feed_name: str):
+        """Drops the unsaved state and the parsed template of a removed or replaced feed."""
+        self._feed_states.pop((channel.id, feed_name), None)
+        self._templates.pop((channel.id, feed_name), None)
+        self._unsaved_feed_states.pop((channel.id, feed_name), None)
+
+    async def _save_feed_states(self):
+        """
+        Saves every changed feed state to config, with one write per channel.
+
+        Only the changed keys are merged into the channel's current feeds, so settings that commands or
+        other bot instances changed since the states were scraped are not overwritten with old values.
+        """
+        if not self._unsaved_feed_states:
+            return
+        unsaved, self._unsaved_feed_states = self._unsaved_feed_states, {}
+        channel_states = {}
+        for (channel_id, feed_name), keys in unsaved.items():
+            channel_states.setdefault(channel_id, {})[feed_name] = keys
+        try:
+            for channel_id, feed_keys in channel_states.items():
+                async with self.config.channel_from_id(channel_id).feeds() as feeds:
+                    for feed_name, keys in feed_keys.items():
+                        state = self._feed_states.get((channel_id, feed_name), None)
+                        if feed_name not in feeds or state is None:
+                            # the feed or its channel was deleted before its state was saved
+                            continue
+                        feeds[feed_name].update({key: state[key] for key in keys})
+        except Exception:
+            # try again on the next save, channels that were already saved are written again
+            for feed_key, keys in unsaved.items():
+                if feed_key in self._feed_states:
+                    self._unsaved_feed_states.setdefault(feed_key, set()).update(keys)
+            raise
 
     async def _valid_url(self, url: str, feed_check=True):
         """Helper for rss add."""
@@ -518,7 +823,7 @@ class RSS(commands.Cog):
                     raise NoFeedContent(error_msg)
                     return False
 
-                rss = feedparser.parse(text)
+                rss = await self._run_in_parser_pool(len(text), feed_parsing.parse_feed, text)
                 if rss.bozo:
                     msg = f"Bozo feed: feedparser is unable to parse the response from {url}.\n\n"
                     msg += "Received content preview:\n"
@@ -533,14 +838,29 @@ class RSS(commands.Cog):
             return False
 
     async def _validate_image(self, url: str):
-        """Helper for _get_current_feed_embed."""
+        """
+        Helper for _get_current_feed_embed.
+
+        Only the start of the image is downloaded to find its type, and the type is remembered for a while
+        as the same images are often used for every entry of a feed.
+        """
+        if url in self._image_types:
+            return self._image_types.get(url)
         try:
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(headers=self._headers, timeout=timeout) as session:
-                async with session.get(url) as resp:
-                    image = await resp.read()
+            headers = {"Range": f"bytes=0-{IMAGE_SNIFF_BYTES - 1}", "Accept-Encoding": "identity"}
+            image = b""
+            async with self._session.get(url, headers=headers, timeout=self._timeout) as resp:
+                # servers that ignore the range send the whole image, only the start of it is read
+                while len(image) < IMAGE_SNIFF_BYTES:
+                    chunk = await resp.content.read(IMAGE_SNIFF_BYTES - len(image))
+                    if not chunk:
+                        break
+                    image += chunk
             img = io.BytesIO(image)
             image_test = imghdr.what(img)
+            if resp.status < 500 and resp.status != 429:
+                # server errors and rate limits are worth trying again on the next entry
+                self._image_types.set(url, image_test)
             return image_test
         except aiohttp.client_exceptions.InvalidURL:
             return None
@@ -588,6 +908,27 @@ class RSS(commands.Cog):
             else:
                 await ctx.send("Invalid or unavailable URL.")
 
+    @checks.is_owner()
+    @rss.command(name="concurrency")
+    async def _rss_concurrency(self, ctx, count: int = None):
+        """
+        Set how many feeds can be checked at the same time.
+
+        Raise this if you have a lot of feeds and they aren't all checked within 5 minutes.
+        This is a global setting for all feeds. Use this command with no count to view the current setting.
+        """
+        if count is None:
+            await ctx.send(f"Up to {await self.config.concurrency()} feeds are checked at the same time.")
+            return
+        if not 1 <= count <= 100:
+            await ctx.send("The count must be between 1 and 100.")
+            return
+
+        await self.config.concurrency.set(count)
+        if self._read_feeds_loop and not self._read_feeds_loop.done():
+            self._set_feed_workers(count)
+        await ctx.send(f"Up to {count} feeds will now be checked at the same time.")
+
     @rss.group(name="embed")
     async def _rss_embed(self, ctx):
         """Embed feed settings."""
@@ -767,63 +1108,135 @@ class RSS(commands.Cog):
 
         await ctx.send(f"Embeds for {bold(feed_name)} are {toggle_text}.")
 
+    @rss.command(name="export")
+    async def _rss_export(self, ctx, channel: Optional[discord.TextChannel] = None):
+        """
+        Export the feeds of this channel or a specific channel as an OPML file.
+
+        The file can be imported into most feed readers, or into another channel with `[p]rss import`.
+        """
+        channel = channel or ctx.channel
+        channel_permission_check = await self._check_channel_permissions(ctx, channel)
+        if not channel_permission_check:
+            return
+
+        feeds = await self.config.channel(channel).feeds()
+        if not feeds:
+            await ctx.send(f"There are no feeds in {channel.mention}.")
+            return
+        opml = build_opml(
+            f"RSS feeds of #{channel.name}", [(feed_name, feeds[feed_name]["url"]) for feed_name in sorted(feeds)]
+        )
+        await ctx.send(file=discord.File(io.BytesIO(opml), filename=f"{channel.name}.opml"))
+
     @rss.command(name="find")
     async def _rss_find(self, ctx, website_url: str):
         """
         Attempts to find RSS feeds from a URL/website.
 
-        The site must have identified their feed in the html of the page based on RSS feed type standards.
+        The feeds that the site identified in the html of the page based on RSS feed type standards are checked,
+        along with the paths where sites often have a feed. Feeds with more entries are listed first.
         """
+        url_parse = urlparse(website_url)
+        if url_parse.scheme not in ["http", "https"] or not url_parse.netloc:
+            await ctx.send("That seems to be an invalid URL. Use a full website URL like `https://www.site.com/`.")
+            return
+
         async with ctx.typing():
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(headers=self._headers, timeout=timeout) as session:
-                try:
-                    async with session.get(website_url) as response:
-                        soup = BeautifulSoup(await response.text(errors="replace"), "html.parser")
-                except (aiohttp.client_exceptions.ClientConnectorError, aiohttp.client_exceptions.ClientPayloadError):
-                    await ctx.send("I can't reach that website.")
-                    return
-                except aiohttp.client_exceptions.InvalidURL:
-                    await ctx.send("That seems to be an invalid URL. Use a full website URL like `https://www.site.com/`.")
-                    return
-                except asyncio.exceptions.TimeoutError:
-                    await ctx.send("The site didn't respond in time or there was no response.")
-                    return
+            html, error_msg = await self._get_url_content(website_url)
+            if not html:
+                await ctx.send(f"I can't reach that website. {error_msg}")
+                return
 
-        if "403 Forbidden" in soup.get_text():
-            await ctx.send("I received a '403 Forbidden' message while trying to reach that site.")
-            return
-        if not soup:
-            await ctx.send("I didn't find anything at all on that link.")
-            return
+            # the link itself can be a feed too
+            candidates = {website_url: None}
+            soup = BeautifulSoup(html, "html.parser")
+            feed_url_types = ["application/rss+xml", "application/atom+xml", "text/xml", "application/rdf+xml"]
+            for feed_type in feed_url_types:
+                for feed in soup.find_all("link", rel="alternate", type=feed_type, href=True):
+                    candidates.setdefault(urljoin(website_url, feed["href"]), feed.get("title", None))
+            advertised = set(candidates)
+            for path in FIND_FEED_PATHS:
+                candidates.setdefault(f"{url_parse.scheme}://{url_parse.netloc}{path}", None)
+
+            found = await self._probe_feed_urls(list(candidates), website_url, html)
 
         msg = ""
-        url_parse = urlparse(website_url)
-        base_url = url_parse.netloc
-        url_scheme = url_parse.scheme
-        feed_url_types = ["application/rss+xml", "application/atom+xml", "text/xml", "application/rdf+xml"]
-        for feed_type in feed_url_types:
-            possible_feeds = soup.find_all("link", rel="alternate", type=feed_type, href=True)
-            for feed in possible_feeds:
-                feed_url = feed.get("href", None)
-                ls_feed_url = feed_url.lstrip("/")
-                if not feed_url:
-                    continue
-                if feed_url.startswith("//"):
-                    final_url = f"{url_scheme}:{feed_url}"
-                elif ((not ls_feed_url.startswith(url_scheme)) and (not ls_feed_url.startswith(base_url))):
-                    final_url = f"{url_scheme}://{base_url}/{ls_feed_url}"
-                elif ls_feed_url.startswith(base_url):
-                    final_url = f"{url_scheme}://{base_url}"
-                else:
-                    final_url = feed_url
-                msg += f"[Feed Title]: {feed.get('title', None)}\n"
-                msg += f"[Feed URL]: {final_url}\n\n"
+        for feed in found:
+            msg += f"[Feed Title]: {candidates[feed.url] or feed.title}\n"
+            msg += f"[Feed URL]: {feed.url}\n"
+            msg += f"[Entries]: {feed.entries}\n\n"
+        # feeds the site points to that didn't turn out to be valid are still worth a look
+        found_urls = {feed.url for feed in found}
+        for feed_url in candidates:
+            if feed_url in advertised and feed_url != website_url and feed_url not in found_urls:
+                msg += f"[Feed Title]: {candidates[feed_url]}\n"
+                msg += f"[Feed URL]: {feed_url}\n"
+                msg += "[Entries]: not a valid feed, or no answer in time\n\n"
         if msg:
-            await ctx.send(box(msg, lang="ini"))
+            for page in pagify(msg, delims=["\n\n"], page_length=1800):
+                await ctx.send(box(page.rstrip(), lang="ini"))
         else:
             await ctx.send("No RSS feeds found in the link provided.")
 
+    async def _probe_feed_urls(self, urls: list, website_url: str, website_html: bytes):
+        """
+        Helper for rss find, checks which urls are feeds at the same time.
+
+        Stops after FIND_TIMEOUT seconds, or FIND_GRACE_PERIOD seconds after the first feed was found.
+        Returns a list of SimpleNamespace(url, title, entries), feeds with the most entries first.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = {}
+        for index, url in enumerate(urls):
+            html = website_html if url == website_url else None
+            tasks[asyncio.ensure_future(self._probe_feed_url(url, html))] = index
+        deadline = loop.time() + FIND_TIMEOUT
+        pending = set(tasks)
+        results = []
+        try:
+            while pending:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    feed = task.result()
+                    if feed:
+                        results.append((tasks[task], feed))
+                        deadline = min(deadline, loop.time() + FIND_GRACE_PERIOD)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # urls that are redirected to the same feed give the same content, the first candidate is kept
+        found = {}
+        for index, feed in sorted(results, key=lambda result: result[0]):
+            found.setdefault(feed.content_hash, feed)
+        return sorted(found.values(), key=lambda feed: feed.entries, reverse=True)
+
+    async def _probe_feed_url(self, url: str, html: bytes = None):
+        """Helper for rss find, returns SimpleNamespace(url, title, entries, content_hash) if a url is a feed."""
+        try:
+            if html is None:
+                html, error_msg = await self._get_url_content(url, log_errors=False)
+                if not html:
+                    return None
+            feedparser_obj = await self._run_in_parser_pool(len(html), feed_parsing.parse_feed, html)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.debug(f"Failure checking a possible feed at url:\n\t{url}", exc_info=True)
+            return None
+        if feedparser_obj.bozo or not feedparser_obj.get("version", None):
+            return None
+        return SimpleNamespace(
+            url=url,
+            title=feedparser_obj.feed.get("title", None),
+            entries=len(feedparser_obj.entries),
+            content_hash=hashlib.blake2b(html, digest_size=8).digest(),
+        )
+
     @rss.command(name="force")
     async def _rss_force(self, ctx, feed_name: str, channel: Optional[discord.TextChannel] = None):
         """Forces a feed alert."""
@@ -846,6 +1259,177 @@ class RSS(commands.Cog):
         rss_feed = feeds[channel.id]["feeds"][feed_name]
         await self.get_current_feed(channel, feed_name, rss_feed, force=True)
 
+    @checks.is_owner()
+    @rss.command(name="health")
+    async def _rss_health(self, ctx):
+        """
+        Show the feed urls that are failing to be checked.
+
+        Feeds back off after each failed check. After a few failures in a row they are skipped
+        until their backoff runs out, then a single check decides if they are working again.
+        """
+        failing = {url: health for url, health in self._feed_health.items() if health.failures}
+        msg = f"[ {len(self._next_check)} feed urls scheduled, {len(failing)} failing ]\n"
+        now = time.time()
+        for url, health in sorted(failing.items(), key=lambda item: -item[1].failures):
+            last_error = (health.last_error or "Unknown error").splitlines()[0]
+            msg += (
+                f"\n{url}\n"
+                f"\tstate = {health.state}, failures = {health.failures}, next check in {max(health.retry_at - now, 0) / 60:.0f} minutes\n"
+                f"\tlast error = {last_error}\n"
+            )
+        for page in pagify(msg, delims=["\n\n", "\n"], page_length=1800):
+            await ctx.send(box(page, lang="ini"))
+
+    @checks.is_owner()
+    @rss.command(name="hostrate")
+    async def _rss_hostrate(self, ctx, requests_per_second: float = None):
+        """
+        Set how many requests per second can be sent to a single website.
+
+        Feeds of a website that is at its limit wait in the feed schedule and don't hold up the feeds of other websites.
+        Websites with more feeds than this rate can check within the minimum check interval get the rate they need instead.
+        This is a global setting for all feeds. Use this command with no rate to view the current setting.
+        """
+        if requests_per_second is None:
+            await ctx.send(f"Up to {self._host_rate:g} requests per second are sent to a single website.")
+            return
+        if not 0.1 <= requests_per_second <= 100:
+            await ctx.send("The rate must be between 0.1 and 100 requests per second.")
+            return
+
+        await self.config.host_rate.set(requests_per_second)
+        self._host_rate = requests_per_second
+        await ctx.send(f"Up to {requests_per_second:g} requests per second will now be sent to a single website.")
+
+    @rss.command(name="import")
+    async def _rss_import(self, ctx, channel: Optional[discord.TextChannel] = None):
+        """
+        Add the feeds of an attached OPML file to this channel or a specific channel.
+
+        Feed names are made from the feed titles in the file. Feeds with a url that is already in the channel are skipped.
+        Most feed readers can export their feeds as an OPML file.
+        """
+        channel = channel or ctx.channel
+        channel_permission_check = await self._check_channel_permissions(ctx, channel)
+        if not channel_permission_check:
+            return
+        if not ctx.message.attachments:
+            await ctx.send("Attach an OPML file to the command message.")
+            return
+        attachment = ctx.message.attachments[0]
+        if attachment.size > MAX_OPML_SIZE:
+            await ctx.send(f"The file is too large, OPML files can be up to {MAX_OPML_SIZE // 1024 // 1024} MB.")
+            return
+
+        async with ctx.typing():
+            try:
+                opml_feeds = parse_opml(await attachment.read())
+            except OPMLError as e:
+                await ctx.send(str(e))
+                return
+
+            existing_feeds = await self.config.channel(channel).feeds()
+            feed_names = set(existing_feeds)
+            urls = {self._normalize_url(feed_data["url"]) for feed_data in existing_feeds.values()}
+            to_import = []
+            skipped = 0
+            for title, url in opml_feeds:
+                if self._normalize_url(url) in urls:
+                    skipped += 1
+                    continue
+                urls.add(self._normalize_url(url))
+                to_import.append((self._get_import_feed_name(title, url, feed_names), url))
+
+            # feeds are checked like on the feed loop, with at most `concurrency` fetches in flight
+            semaphore = asyncio.Semaphore(await self.config.concurrency())
+            results = await asyncio.gather(
+                *(self._import_feed(semaphore, feed_name, url) for feed_name, url in to_import)
+            )
+            new_feeds = {}
+            failed = []
+            for (feed_name, url), (rss_object, error_msg) in zip(to_import, results):
+                if rss_object:
+                    new_feeds[feed_name] = rss_object.to_json()
+                else:
+                    failed.append((url, error_msg))
+
+            if new_feeds:
+                async with self.config.channel(channel).feeds() as feed_data:
+                    feed_data.update(new_feeds)
+                for feed_name, rss_feed in new_feeds.items():
+                    self._forget_feed_state(channel, feed_name)
+                    self._add_subscription(channel, feed_name, rss_feed["url"])
+
+        msg = f"Added {len(new_feeds)} feeds to {channel.mention}."
+        if skipped:
+            msg += f" {skipped} feeds were already in the channel."
+        if new_feeds:
+            msg += f"\nList the added feeds with `{ctx.prefix}rss list`."
+        await ctx.send(msg)
+        if failed:
+            failed_msg = f"{len(failed)} feeds couldn't be added:\n\n"
+            failed_msg += "\n".join(f"{url}\n\t{error_msg}" for url, error_msg in failed)
+            for page in pagify(failed_msg, delims=["\n"], page_length=1800):
+                await ctx.send(box(page))
+
+    @staticmethod
+    def _get_import_feed_name(title: str, url: str, feed_names: set):
+        """Helper for rss import, makes a feed name that can be typed in commands and isn't taken yet."""
+        name = re.sub(r"[^\w-]+", "_", (title or urlparse(url).netloc).lower()).strip("_")
+        name = name[:IMPORT_FEED_NAME_LENGTH] or "feed"
+        feed_name = name
+        number = 2
+        while feed_name in feed_names:
+            feed_name = f"{name}_{number}"
+            number += 1
+        feed_names.add(feed_name)
+        return feed_name
+
+    async def _import_feed(self, semaphore: asyncio.Semaphore, feed_name: str, url: str):
+        """Helper for rss import, returns the RssFeed of a url and None, or None and why it failed."""
+        async with semaphore:
+            if not feed_parsing.is_url(url):
+                return None, "Invalid URL."
+            try:
+                feedparser_obj = await self._fetch_feedparser_object(url)
+                error_msg = getattr(feedparser_obj, "error", None)
+                if error_msg:
+                    return None, error_msg.splitlines()[0]
+                if not feedparser_obj.get("version", None):
+                    # feedparser parses html pages without a bozo error, but doesn't find a feed format in them
+                    return None, "There is no RSS or Atom feed at this url."
+                return await self._make_rss_feed(feed_name, url, feedparser_obj), None
+            except Exception as e:
+                log.error(f"Failure importing feed at url:\n\t{url}", exc_info=e)
+                return None, "There was an unexpected error. Check your console for more information."
+
+    @checks.is_owner()
+    @rss.command(name="interval")
+    async def _rss_interval(self, ctx, min_minutes: int = None, max_minutes: int = None):
+        """
+        Set the bounds for how often feeds are checked.
+
+        Each feed is checked at about half of the usual time between its posts, but never more often than every `min_minutes`
+        and never less often than every `max_minutes`. Feeds that post rarely are checked less often than busy feeds.
+        This is a global setting for all feeds. Use `[p]rss force` to post the latest entry of a feed right away.
+        Use this command with no arguments to view the current settings.
+        """
+        if min_minutes is None:
+            min_interval, max_interval = self._check_interval_bounds
+            await ctx.send(f"Feeds are checked every {min_interval // 60} to {max_interval // 60} minutes.")
+            return
+
+        max_minutes = max_minutes or max(min_minutes, self._check_interval_bounds[1] // 60)
+        if not 1 <= min_minutes <= max_minutes <= 1440:
+            await ctx.send("The intervals must be between 1 and 1440 minutes, and the minimum can't be above the maximum.")
+            return
+
+        await self.config.min_check_interval.set(min_minutes * 60)
+        await self.config.max_check_interval.set(max_minutes * 60)
+        self._check_interval_bounds = (min_minutes * 60, max_minutes * 60)
+        await ctx.send(f"Feeds will now be checked every {min_minutes} to {max_minutes} minutes.")
+
     @rss.command(name="limit")
     async def _rss_limit(self, ctx, feed_name: str, channel: Optional[discord.TextChannel] = None, character_limit: int = None):
         """
@@ -923,7 +1507,7 @@ class RSS(commands.Cog):
     async def _rss_list_tags_helper(self, ctx, rss_feed: dict, feed_name: str):
         """Helper function for rss listtags."""
         msg = f"[ Available Tags for {feed_name} ]\n\n\t"
-        feedparser_obj = await self._fetch_feedparser_object(rss_feed["url"])
+        feedparser_obj = await self._fetch_recent_feedparser_object(rss_feed["url"])
 
         if not feedparser_obj:
             await ctx.send("Couldn't fetch that feed.")
@@ -940,7 +1524,7 @@ class RSS(commands.Cog):
                 # these tags attached to the rss feed object are for internal handling options
                 continue
 
-            tag_content_check = await self._get_tag_content_type(tag_content)
+            tag_content_check = feed_parsing.get_tag_content_type(tag_content)
             if tag_content_check == TagType.HTML:
                 msg += f"[X] ${tag_name}\n\t"
             elif tag_content_check == TagType.DICT:
@@ -956,6 +1540,28 @@ class RSS(commands.Cog):
 
         await ctx.send(box(msg, lang="ini"))
 
+    @checks.is_owner()
+    @rss.command(name="maxsize")
+    async def _rss_maxsize(self, ctx, megabytes: int = None):
+        """
+        Set the largest feed size that will be downloaded.
+
+        Feeds above this size are not read any further and count as failed checks.
+        This is a global setting for all feeds. Use this command with no arguments to view the current setting.
+        """
+        if megabytes is None:
+            max_feed_size = await self.config.max_feed_size()
+            await ctx.send(f"Feeds larger than {max_feed_size / 1024 / 1024:.0f} MB are not downloaded.")
+            return
+
+        if not 1 <= megabytes <= 100:
+            await ctx.send("The size limit must be between 1 and 100 MB.")
+            return
+
+        self._max_feed_size = megabytes * 1024 * 1024
+        await self.config.max_feed_size.set(self._max_feed_size)
+        await ctx.send(f"Feeds larger than {megabytes} MB are no longer downloaded.")
+
     @checks.is_owner()
     @rss.group(name="parse")
     async def _rss_parse(self, ctx):
@@ -991,6 +1597,7 @@ class RSS(commands.Cog):
         else:
             override_list.append(website)
             await self.config.use_published.set(override_list)
+            self._use_published.add(website)
             await ctx.send(f"`{website}` was added to the parsing override list.")
 
     @_rss_parse.command(name="list")
@@ -1020,6 +1627,7 @@ class RSS(commands.Cog):
         if website in override_list:
             override_list.remove(website)
             await self.config.use_published.set(override_list)
+            self._use_published.discard(website)
             await ctx.send(f"`{website}` was removed from the parsing override list.")
         else:
             await ctx.send(f"`{website}` isn't in the parsing override list.")
@@ -1099,6 +1707,107 @@ class RSS(commands.Cog):
         for page in pagify(msg, delims=["\n"], page_length=1800):
             await ctx.send(page)
 
+    @checks.is_owner()
+    @rss.command(name="shard")
+    async def _rss_shard(self, ctx, index: int = None, count: int = None):
+        """
+        Split the feed urls between several bot instances that share a config backend.
+
+        Each instance checks the feed urls that are assigned to its index (starting at 0) out of `count` instances.
+        Set the same count on every instance, and a different index on each one. A count of 1 checks every feed url here.
+        The instances must be able to send messages in the channels of the feeds they check.
+
+        This is an alternative to running the bot's shards in separate processes, which already split the feeds:
+        each process only checks the channels of the guilds on its own shards. Feed urls can only be split between
+        instances that each run every shard, so that every instance can see the channels of every feed url.
+        Use this command with no arguments to view the current setting of this instance.
+        """
+        instance_name = self._get_instance_name()
+        if index is None or count is None:
+            worker_index, worker_count = self._worker
+            if worker_count <= 1 and not self._runs_every_shard():
+                await ctx.send(f"This instance (`{instance_name}`) checks the feed urls of the guilds on its shards.")
+            elif worker_count <= 1:
+                await ctx.send(f"This instance (`{instance_name}`) checks every feed url.")
+            else:
+                checked = sum(1 for url in self._feed_subscriptions if self._owns_url(url))
+                await ctx.send(
+                    f"This instance (`{instance_name}`) is instance {worker_index} of {worker_count} "
+                    f"and checks {checked} of {len(self._feed_subscriptions)} feed urls."
+                )
+            return
+
+        if count < 1 or not 0 <= index < count:
+            await ctx.send("The count must be at least 1, and the index between 0 and the count minus 1.")
+            return
+        if count > 1 and not self._runs_every_shard():
+            await ctx.send(
+                "This instance only runs some of the bot's shards, so its feeds are already split by shard. "
+                "Feed urls can only be split between instances that run every shard."
+            )
+            return
+
+        await self.config.worker_count.set(count)
+        async with self.config.worker_indexes() as worker_indexes:
+            worker_indexes[instance_name] = index
+        self._worker = (index, count)
+        await self._put_feeds_in_queue()
+        if count == 1:
+            await ctx.send(f"This instance (`{instance_name}`) now checks every feed url.")
+        else:
+            await ctx.send(
+                f"This instance (`{instance_name}`) is now instance {index} of {count}. "
+                "Set the same count on the other instances."
+            )
+
+    @checks.is_owner()
+    @rss.command(name="stats")
+    async def _rss_stats(self, ctx, count: int = 5):
+        """
+        Show the slowest feeds, the biggest feeds and how far behind the feed checks are.
+
+        The numbers are kept since the cog was loaded. Checks should start within
+        5 minutes of being due, feeds that waited longer are counted as behind.
+        """
+        feed_metrics = {url: metrics for url, metrics in self._feed_metrics.items() if metrics.checks}
+        if not feed_metrics:
+            await ctx.send("No feeds have been checked yet.")
+            return
+
+        queue_lags = [metrics.queue_lag for metrics in feed_metrics.values()]
+        msg = (
+            "[ Feed checks ]\n"
+            f"feed urls = {len(self._next_check)}, checks = {sum(m.checks for m in feed_metrics.values())}, "
+            f"posted = {sum(m.posted for m in feed_metrics.values())}, "
+            f"downloaded = {sum(m.downloaded for m in feed_metrics.values()) / 1024 / 1024:.1f} MiB\n"
+            f"queue lag = {statistics.median(queue_lags):.1f}s median, {max(queue_lags):.1f}s max, "
+            f"{sum(lag > CHECK_INTERVAL for lag in queue_lags)} feed urls behind\n"
+        )
+
+        msg += "\n[ Slowest feeds ]\n"
+        slowest = sorted(feed_metrics.items(), key=lambda item: -(item[1].fetch_latency or 0))[:count]
+        for url, metrics in slowest:
+            msg += (
+                f"{url}\n\tfetch = {(metrics.fetch_latency or 0) * 1000:.0f}ms, "
+                f"parse = {(metrics.parse_time or 0) * 1000:.0f}ms, enrich = {metrics.enrich_time * 1000:.0f}ms\n"
+            )
+
+        msg += "\n[ Biggest feeds ]\n"
+        biggest = sorted(feed_metrics.items(), key=lambda item: -item[1].size)[:count]
+        for url, metrics in biggest:
+            msg += f"{url}\n\tsize = {metrics.size / 1024:.0f}KiB, entries = {metrics.entries}\n"
+
+        msg += "\n[ Busiest hosts ]\n"
+        busiest = sorted(self._host_metrics.items(), key=lambda item: -item[1].requests)[:count]
+        for host, host_metrics in busiest:
+            msg += (
+                f"{host}\n\trequests = {host_metrics.requests}, errors = {host_metrics.errors}, "
+                f"average fetch = {host_metrics.average_latency * 1000:.0f}ms\n"
+            )
+
+        for page in pagify(msg, delims=["\n["], page_length=1800):
+            await ctx.send(box(page, lang="ini"))
+
     @rss.group(name="tag")
     async def _rss_tag(self, ctx):
         """RSS post tag qualification."""
@@ -1192,24 +1901,181 @@ class RSS(commands.Cog):
         else:
             await ctx.send("Feed not found!")
 
+    @checks.is_owner()
+    @rss.command(name="timeout")
+    async def _rss_timeout(self, ctx, total_seconds: int = None, connect_seconds: int = None):
+        """
+        Set the timeouts used when fetching feeds and images.
+
+        `total_seconds` is the maximum time for a whole request and `connect_seconds` is the maximum time to open a connection.
+        This is a global setting for all feeds. Use this command with no arguments to view the current settings.
+        """
+        if total_seconds is None:
+            total = await self.config.request_timeout()
+            connect = await self.config.connect_timeout()
+            await ctx.send(f"Requests time out after {total} seconds, connection attempts after {connect} seconds.")
+            return
+
+        connect_seconds = connect_seconds or min(total_seconds, await self.config.connect_timeout())
+        if not 1 <= connect_seconds <= total_seconds <= 120:
+            await ctx.send("Timeouts must be between 1 and 120 seconds, and the connect timeout can't be above the total timeout.")
+            return
+
+        await self.config.request_timeout.set(total_seconds)
+        await self.config.connect_timeout.set(connect_seconds)
+        self._timeout = aiohttp.ClientTimeout(total=total_seconds, sock_connect=connect_seconds)
+        await ctx.send(f"Requests now time out after {total_seconds} seconds, connection attempts after {connect_seconds} seconds.")
+
     @rss.command(name="version", hidden=True)
     async def _rss_version(self, ctx):
         """Show the RSS version."""
         await ctx.send(f"RSS version {__version__}")
 
+    @checks.is_owner()
+    @rss.group(name="websub")
+    async def _rss_websub(self, ctx):
+        """
+        Push mode settings: feeds with a WebSub hub send their new entries to the bot instead of waiting for a check.
+
+        The bot runs a small web server for the hubs, which has to be reachable at the callback url,
+        for example through a reverse proxy. These feeds are still checked as a fallback, less often.
+        """
+        pass
+
+    @_rss_websub.command(name="list")
+    async def _rss_websub_list(self, ctx):
+        """List the WebSub subscriptions of the feeds."""
+        if not self._websub:
+            await ctx.send("There are no WebSub subscriptions.")
+            return
+
+        msg = ""
+        for sub in sorted(self._websub.values(), key=lambda sub: sub.url):
+            if sub.active:
+                state = f"active until {time.strftime('%Y-%m-%d %H:%M', time.localtime(sub.expires))}"
+            elif sub.mode == "subscribe":
+                state = "waiting for the hub"
+            elif sub.mode == "unsubscribe":
+                state = "unsubscribing"
+            else:
+                state = "denied by the hub"
+            msg += f"{sub.url}\n\thub = {sub.hub}\n\t{state}\n"
+        for page in pagify(msg, delims=["\n"], page_length=1800):
+            await ctx.send(box(page, lang="ini"))
+
+    @_rss_websub.command(name="listen")
+    async def _rss_websub_listen(self, ctx, host: str = None, port: int = None):
+        """
+        Set the address and port that the WebSub callback server listens on.
+
+        The default is 127.0.0.1 port 8080, for a reverse proxy on the same machine.
+        Use this command with no arguments to view the current settings.
+        """
+        if host is None:
+            await ctx.send(
+                f"The callback server listens on {await self.config.websub_host()} port {await self.config.websub_port()}."
+            )
+            return
+
+        port = port or await self.config.websub_port()
+        if not 1 <= port <= 65535:
+            await ctx.send("The port must be between 1 and 65535.")
+            return
+
+        await self.config.websub_host.set(host)
+        await self.config.websub_port.set(port)
+        msg = f"The callback server now listens on {host} port {port}."
+        if self._websub_runner:
+            error_msg = await self._start_websub_server()
+            if error_msg:
+                msg = f"{error_msg}\nPush mode stops working until the server can start."
+        await ctx.send(msg)
+
+    @_rss_websub.command(name="toggle")
+    async def _rss_websub_toggle(self, ctx):
+        """
+        Toggle push mode for the feeds that advertise a WebSub hub.
+
+        Feeds are subscribed to on their next check.
+        """
+        if await self.config.websub_enabled():
+            await self.config.websub_enabled.set(False)
+            for sub in list(self._websub.values()):
+                if sub.mode == "subscribe":
+                    await self._send_websub_request(sub, "unsubscribe")
+                await self._drop_websub(sub)
+            await self._stop_websub_server()
+            await ctx.send("Push mode is disabled, every feed is only checked.")
+            return
+
+        if not await self.config.websub_url():
+            await ctx.send(f"Set the callback url first with `{ctx.prefix}rss websub url`.")
+            return
+        error_msg = await self._start_websub_server()
+        if error_msg:
+            await ctx.send(error_msg)
+            return
+        await self.config.websub_enabled.set(True)
+        await ctx.send("Push mode is enabled, feeds with a WebSub hub are subscribed to on their next check.")
+
+    @_rss_websub.command(name="url")
+    async def _rss_websub_url(self, ctx, url: str = None):
+        """
+        Set the public url of the WebSub callback server, that the hubs send requests to.
+
+        For example `https://bot.example.com/websub` on a reverse proxy to the callback server.
+        Use this command with no arguments to view the current setting.
+        """
+        if url is None:
+            current_url = await self.config.websub_url()
+            await ctx.send(f"The callback url is {current_url}." if current_url else "There is no callback url set.")
+            return
+
+        result = urlparse(url)
+        if result.scheme not in ["http", "https"] or not result.netloc:
+            await ctx.send("That doesn't seem to be a valid url.")
+            return
+
+        await self.config.websub_url.set(url)
+        if self._websub_runner:
+            self._websub_url = url
+        await ctx.send(f"The callback url is now {url}. Subscriptions move to it when they're renewed.")
+
+    @checks.is_owner()
+    @rss.command(name="workers")
+    async def _rss_workers(self, ctx, count: int = None, processes: bool = False):
+        """
+        Set how many workers parse feeds outside of the bot's event loop.
+
+        Large feeds and html-heavy posts are parsed by these workers so they can't hold up the bot.
+        Workers are threads by default, use `True` for `processes` to parse in separate processes instead.
+        Processes use more memory, but can parse several feeds at the same time on multiple CPU cores.
+        Use 0 workers to parse everything on the event loop, or this command with no count to view the current setting.
+        """
+        if count is None:
+            count = await self.config.parser_workers()
+            kind = "process" if await self.config.parser_processes() else "thread"
+            await ctx.send(f"Feeds are parsed by {count} {kind} worker(s).")
+            return
+        if not 0 <= count <= 32:
+            await ctx.send("The count must be between 0 and 32.")
+            return
+
+        await self.config.parser_workers.set(count)
+        await self.config.parser_processes.set(processes)
+        self._set_parser_pool(count, processes)
+        kind = "process" if processes else "thread"
+        await ctx.send(f"Feeds will now be parsed by {count} {kind} worker(s).")
+
     async def get_current_feed(self, channel: discord.TextChannel, name: str, rss_feed: dict, *, force: bool = False):
         """Takes an RSS feed and builds an object with all extra tags"""
         log.debug(f"getting feed {name} on cid {channel.id}")
-        url = rss_feed["url"]
-        last_title = rss_feed["last_title"]
-        # last_link is a get for feeds saved before RSS 1.1.5 which won't have this attrib till it's checked once
-        last_link = rss_feed.get("last_link", None)
-        # last_time is a get for feeds saved before RSS 1.1.7 which won't have this attrib till it's checked once
-        last_time = rss_feed.get("last_time", None)
-        template = rss_feed["template"]
-        message = None
-
-        feedparser_obj = await self._fetch_feedparser_object(url)
+        # a single channel's check never sends the shared validators of the url:
+        # a 304 would hide content that the other channels on this url have not seen yet
+        if force:
+            feedparser_obj = await self._fetch_recent_feedparser_object(rss_feed["url"])
+        else:
+            feedparser_obj = await self._fetch_feedparser_object(rss_feed["url"])
         if not feedparser_obj:
             return
         try:
@@ -1218,85 +2084,232 @@ class RSS(commands.Cog):
         except AttributeError:
             pass
 
+        sorted_feed_by_post_time = await self._sort_feedparser_object(feedparser_obj)
+        needed = self._get_needed_tags(channel, name, rss_feed)
+        await self._post_new_entries(channel, name, rss_feed, sorted_feed_by_post_time, {}, needed, force=force)
+
+    async def get_current_feeds(self, url: str, subscriptions: list):
+        """
+        Fetches a feed url once and posts its new entries in every channel subscribed to it.
+
+        subscriptions: a list of SimpleNamespace(channel, feed_name, feed_data) sharing the same normalized url
+        """
+        log.debug(f"getting feed url {url} for {len(subscriptions)} subscription(s)")
+        saved_validators = self._feed_validators.get(url, None)
+        cached_body = None
+        if saved_validators is None:
+            cached = await self._run_in_feed_cache("get", url)
+            if cached:
+                # the first check after a restart sends the validators of the response on disk,
+                # a 304 parses that response and the entries that were already posted are skipped as seen
+                cached_body = cached.body
+                saved_validators = {"etag": cached.etag, "last_modified": cached.last_modified}
+        if saved_validators is None:
+            # etag and last_modified are gets for feeds saved before RSS 1.6.0.
+            # they are only usable if every channel has seen the same response
+            saved_validators = {"etag": None, "last_modified": None}
+            stored = {(sub.feed_data.get("etag", None), sub.feed_data.get("last_modified", None)) for sub in subscriptions}
+            if len(stored) == 1:
+                saved_validators["etag"], saved_validators["last_modified"] = stored.pop()
+        validators = dict(saved_validators)
+
+        feedparser_obj = await self._fetch_feedparser_object(url, validators, cached_body)
+        try:
+            log.debug(f"{feedparser_obj.error} Url: {url}")
+            self._record_failure(url, feedparser_obj.error)
+            return
+        except AttributeError:
+            self._record_success(url)
+        if getattr(feedparser_obj, "not_modified", False):
+            log.debug(f"Feed url {url} was not modified since the last check")
+            return
+
+        self._discover_websub(url, feedparser_obj.feed)
+        if url in self._feed_metrics:
+            self._feed_metrics[url].entries = len(feedparser_obj.entries)
+        skipped = await self._post_feed_entries(url, subscriptions, feedparser_obj, validators=validators)
+        if not skipped:
+            # a skipped channel needs the full response again on the next check instead of a 304
+            self._feed_validators[url] = validators
+
+    async def _post_feed_entries(
+        self,
+        url: str,
+        subscriptions: list,
+        feedparser_obj: feedparser.util.FeedParserDict,
+        *,
+        validators: dict = None,
+        pushed: bool = False,
+    ):
+        """
+        Helper for get_current_feeds and pushed feeds, posts the new entries of a feed in every subscribed channel.
+
+        Returns True if a channel was skipped because its post queue is full.
+        """
+        sorted_feed_by_post_time = await self._sort_feedparser_object(feedparser_obj)
+        entry_times = [self._time_tag_validation(entry) for entry in sorted_feed_by_post_time[:ARRIVAL_HISTORY]]
+        self._record_arrivals(url, [entry_time for entry_time in entry_times if entry_time])
+
+        # entries are only enriched once, with the tags that any of the channels can use
+        enriched = {}
+        needed = set()
+        for sub in subscriptions:
+            needed.update(self._get_needed_tags(sub.channel, sub.feed_name, sub.feed_data))
+        skipped = False
+        for sub in subscriptions:
+            if len(self._post_queues.get(sub.channel.id, ())) >= POST_QUEUE_LIMIT:
+                # the channel can't keep up with its posts, its new entries are still new on the next check
+                log.debug(f"Post queue of cid {sub.channel.id} is full, skipping feed {sub.feed_name} this time")
+                skipped = True
+                continue
+            try:
+                await self._post_new_entries(
+                    sub.channel,
+                    sub.feed_name,
+                    sub.feed_data,
+                    sorted_feed_by_post_time,
+                    enriched,
+                    needed,
+                    validators=validators,
+                    pushed=pushed,
+                )
+            except Exception as e:
+                log.error(f"Failure posting feed {sub.feed_name} on cid {sub.channel.id}", exc_info=e)
+        return skipped
+
+    async def _sort_feedparser_object(self, feedparser_obj: feedparser.util.FeedParserDict):
+        """Helper for get_current_feed(s)."""
         # sorting the entire feedparser object by updated_parsed time if it exists, if not then published_parsed
         # certain feeds can be rearranged by a user, causing all posts to be out of sequential post order
         # or some feeds are out of time order by default
         if feedparser_obj.entries:
             # this feed has posts
-            sorted_feed_by_post_time = await self._sort_by_post_time(feedparser_obj.entries)
+            return self._sort_by_post_time(feedparser_obj.entries)
         else:
             # this feed does not have posts, but it has a header with channel information
-            sorted_feed_by_post_time = [feedparser_obj.feed]
-
-        if not force:
-            entry_time = await self._time_tag_validation(sorted_feed_by_post_time[0])
-            if (last_time and entry_time) is not None:
-                if last_time > entry_time:
-                    log.debug("Not posting because new entry is older than last saved entry.")
-                    return
-            await self._update_last_scraped(channel, name, sorted_feed_by_post_time[0].title, sorted_feed_by_post_time[0].link, entry_time)
-
-        feedparser_plus_objects = []
-        for entry in sorted_feed_by_post_time:
+            return [feedparser_obj.feed]
 
-            # find the updated_parsed (checked first) or an published_parsed tag if they are present
-            entry_time = await self._time_tag_validation(entry)
+    async def _get_feedparser_plus_object(
+        self, entry: feedparser.util.FeedParserDict, url: str, enriched: dict, needed: set
+    ):
+        """Helper for _post_new_entries, adds the needed extra tags to an entry only once per fetch."""
+        if id(entry) not in enriched:
+            enriched[id(entry)] = await self._add_to_feedparser_object(entry, url, needed)
+        return enriched[id(entry)]
+
+    def _get_needed_tags(self, channel: discord.TextChannel, feed_name: str, rss_feed: dict):
+        """Gets the names of the tags that a feed's posts can use."""
+        needed = self._get_template(channel, feed_name, rss_feed["template"]).get_tag_names()
+        for image_setting in ["embed_image", "embed_thumbnail"]:
+            if rss_feed.get(image_setting, None):
+                needed.add(rss_feed[image_setting])
+        if rss_feed.get("allowed_tags", []):
+            needed.add("tags_list")
+        return needed
+
+    def _get_template(self, channel: discord.TextChannel, feed_name: str, template: str):
+        """Gets the parsed template of a feed, it's only parsed again when the template changes."""
+        feed_key = (channel.id, feed_name)
+        quiet_template = self._templates.get(feed_key, None)
+        if quiet_template is None or quiet_template.template != template:
+            quiet_template = self._templates[feed_key] = QuietTemplate(template)
+        return quiet_template
+
+    def _fill_template(
+        self,
+        channel: discord.TextChannel,
+        name: str,
+        template: str,
+        feedparser_plus_obj: feedparser.util.FeedParserDict,
+    ):
+        """Helper for _post_new_entries, fills a feed's template with the tags of an entry."""
+        quiet_template = self._get_template(channel, name, template)
+        # the entry's own keys only, feedparser's key aliases are not template tags
+        values = {
+            tag_name: dict.__getitem__(feedparser_plus_obj, tag_name)
+            for tag_name in quiet_template.tag_names
+            if dict.__contains__(feedparser_plus_obj, tag_name)
+        }
+        values["name"] = bold(name)
+        return quiet_template.quiet_render(values)
+
+    async def _post_new_entries(
+        self,
+        channel: discord.TextChannel,
+        name: str,
+        rss_feed: dict,
+        sorted_feed_by_post_time: list,
+        enriched: dict,
+        needed: set,
+        *,
+        force: bool = False,
+        validators: dict = None,
+        pushed: bool = False,
+    ):
+        """Finds the entries of a fetched or pushed feed that are new for a channel's feed and posts them."""
+        url = rss_feed["url"]
+        # last_time is a get for feeds saved before RSS 1.1.7 which won't have this attrib till it's checked once
+        last_time = rss_feed.get("last_time", None)
+        # seen is a get for feeds saved before RSS 1.6.0 which won't have this attrib till it's checked once
+        seen = rss_feed.get("seen", None)
+        template = rss_feed["template"]
+        message = None
 
+        if force:
             # we only need one feed entry if this is from rss force
-            if force:
-                feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                feedparser_plus_objects.append(feedparser_plus_obj)
-                break
-
-            # if this feed has a published_parsed or an updated_parsed tag, it will use
-            # that time value present in entry_time to verify that the post is new.
-            elif (entry_time and last_time) is not None:
-                # now that we are sorting by/saving updated_parsed instead of published_parsed (rss 1.4.0+)
-                # we can post an update for a post that already exists and has already been posted.
-                # this will only work for rss sites that are single-use like cloudflare status, discord status, etc
-                # where an update on the last post should be posted
-                # this can be overridden by a bot owner in the rss parse command, per problematic website
-                if (last_title == entry.title) and (last_link == entry.link) and (entry_time > last_time):
-                    log.debug(f"New update found for an existing post in {name} on cid {channel.id}")
-                    feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                    feedparser_plus_objects.append(feedparser_plus_obj)
-                # regular feed qualification after this
-                if (last_title != entry.title) and (last_link != entry.link) and (last_time < entry_time):
-                    log.debug(f"New entry found via time validation for feed {name} on cid {channel.id}")
-                    feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                    feedparser_plus_objects.append(feedparser_plus_obj)
-                if (last_title == "" and entry.title == "") and (last_link != entry.link) and (last_time < entry_time):
-                    log.debug(f"New entry found via time validation for feed {name} on cid {channel.id} - no title")
-                    feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                    feedparser_plus_objects.append(feedparser_plus_obj)
-
-            # this is a post that has no time information attached to it and we can only
-            # verify that the title and link did not match the previously posted entry
-            elif (entry_time or last_time) is None:
-                if last_title == entry.title and last_link == entry.link:
-                    log.debug(f"Breaking rss entry loop for {name} on {channel.id}, via link match")
-                    break
-                else:
-                    log.debug(f"New entry found for feed {name} on cid {channel.id} via new link or title")
-                    feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                    feedparser_plus_objects.append(feedparser_plus_obj)
-
-            # we found a match for a previous feed post
+            new_entries = sorted_feed_by_post_time[:1]
+        else:
+            entry_times = [self._time_tag_validation(entry) for entry in sorted_feed_by_post_time]
+            entry_hashes = [self._get_entry_hash(entry, entry_time) for entry, entry_time in zip(sorted_feed_by_post_time, entry_times)]
+
+            new_entries = []
+            if seen is None:
+                # first check since the seen entries were introduced, only entries that are newer
+                # than the last saved entry time can be told apart from what was already posted
+                if last_time is not None:
+                    new_entries = [
+                        entry
+                        for entry, entry_time in zip(sorted_feed_by_post_time, entry_times)
+                        if entry_time is not None and entry_time > last_time
+                    ]
             else:
-                log.debug(
-                    f"Breaking rss entry loop for {name} on {channel.id}, we found where we are supposed to be caught up to"
-                )
-                break
+                seen_entries = set(seen)
+                new_entries = [
+                    entry
+                    for entry, entry_hash in zip(sorted_feed_by_post_time, entry_hashes)
+                    if entry_hash not in seen_entries
+                ]
+                # nothing in the whole feed matched to what was saved, so let's only post 1 instead of every single post.
+                # pushed content usually only has the new entries, so nothing in it matching is expected
+                if seen and not pushed and len(new_entries) == len(sorted_feed_by_post_time) > 1:
+                    log.debug(f"Couldn't match anything for feed {name} on cid {channel.id}, only posting 1 post")
+                    new_entries = new_entries[:1]
+
+            self._update_last_scraped(
+                channel,
+                name,
+                rss_feed,
+                sorted_feed_by_post_time[0].title,
+                sorted_feed_by_post_time[0].link,
+                entry_times[0],
+                validators,
+                self._merge_seen_entries(entry_hashes, seen or []),
+            )
+            if new_entries:
+                log.debug(f"{len(new_entries)} new entries found for feed {name} on cid {channel.id}")
 
-        # nothing in the whole feed matched to what was saved, so let's only post 1 instead of every single post
-        if len(feedparser_plus_objects) == len(sorted_feed_by_post_time):
-            log.debug(f"Couldn't match anything for feed {name} on cid {channel.id}, only posting 1 post")
-            feedparser_plus_objects = [feedparser_plus_objects[0]]
+        feedparser_plus_objects = [
+            await self._get_feedparser_plus_object(entry, url, enriched, needed) for entry in new_entries
+        ]
 
         if not feedparser_plus_objects:
             # early-exit so that we don't dispatch when there's no updates
             return
 
+        if not force and not any(self._time_tag_validation(obj) for obj in feedparser_plus_objects):
+            # entries without a time are timed by when they were found instead
+            self._record_arrivals(self._normalize_url(url), [int(time.time())])
+
         # post oldest first
         feedparser_plus_objects.reverse()
 
@@ -1322,8 +2335,7 @@ class RSS(commands.Cog):
                     continue
 
             # starting to fill out the template for feeds that passed tag verification (if present)
-            to_fill = QuietTemplate(template)
-            message = to_fill.quiet_safe_substitute(name=bold(name), **feedparser_plus_obj)
+            message = self._fill_template(channel, name, template, feedparser_plus_obj)
 
             if len(message.strip(" ")) == 0:
                 message = None
@@ -1345,7 +2357,7 @@ class RSS(commands.Cog):
                 await self._get_current_feed_embed(channel, rss_feed, feedparser_plus_obj, message)
             else:
                 for page in pagify(message, delims=["\n"]):
-                    await channel.send(page)
+                    self._queue_post(channel, content=page)
 
             # This event can be used in 3rd-party using listeners.
             # This may (and most likely will) get changes in the future
@@ -1365,6 +2377,9 @@ class RSS(commands.Cog):
             #     True if the update was forced (through `[p]rss force`), False otherwise.
             feedparser_dict_proxy = MappingProxyType(feedparser_plus_obj)
             proxied_dicts.append(feedparser_dict_proxy)
+            metrics = self._feed_metrics.get(self._normalize_url(url), None)
+            if metrics:
+                metrics.posted += 1
             self.bot.dispatch(
                 "aikaternacogs_rss_message",
                 channel=channel,
@@ -1447,101 +2462,595 @@ class RSS(commands.Cog):
             pass
 
         for embed in embed_list:
-            await channel.send(embed=embed)
+            self._queue_post(channel, embed=embed)
+
+    def _queue_post(self, channel: discord.TextChannel, content: str = None, embed: discord.Embed = None):
+        """
+        Adds a message to a channel's post queue, channels are sent to on their own so
+        a rate limited channel doesn't hold up the feed checks or the other channels.
+        """
+        self._post_queues.setdefault(channel.id, deque()).append((content, embed))
+        if channel.id not in self._post_senders:
+            self._post_senders[channel.id] = self.bot.loop.create_task(self._send_posts(channel))
+
+    async def _send_posts(self, channel: discord.TextChannel):
+        """Sends the post queue of a channel in order, with queued embeds sent together where possible."""
+        queue = self._post_queues[channel.id]
+        try:
+            while queue:
+                content, embed = queue.popleft()
+                try:
+                    if embed is None:
+                        await channel.send(content)
+                    elif EMBEDS_PER_MESSAGE > 1:
+                        embeds = [embed]
+                        characters = len(embed)
+                        while (
+                            queue
+                            and queue[0][1] is not None
+                            and len(embeds) < EMBEDS_PER_MESSAGE
+                            and characters + len(queue[0][1]) <= EMBED_CHARACTERS_PER_MESSAGE
+                        ):
+                            embeds.append(queue.popleft()[1])
+                            characters += len(embeds[-1])
+                        await channel.send(embeds=embeds)
+                    else:
+                        await channel.send(embed=embed)
+                except Exception as e:
+                    log.error(f"Failure sending a feed post on cid {channel.id}", exc_info=e)
+        finally:
+            del self._post_senders[channel.id]
+            if not queue:
+                del self._post_queues[channel.id]
 
     async def read_feeds(self):
         """Feed poster loop."""
         await self.bot.wait_until_red_ready()
-        await self._put_feeds_in_queue()
-        self._post_queue_size = self._post_queue.qsize()
+        self._set_feed_workers(await self.config.concurrency())
+        schedule_built = False
+        next_refresh = 0
+        next_websub_renewal = 0
+        next_save = time.time() + FEED_STATE_SAVE_INTERVAL
         while True:
             try:
-                queue_item = await self._get_next_in_queue()
-                if not queue_item:
-                    # the queue is empty
-                    config_data = await self.config.all_channels()
-                    if not config_data:
-                        # nothing to check
-                        log.debug(f"Sleeping, nothing to do")
-                        await asyncio.sleep(30)
-                        continue
-                    if self._post_queue_size < 300:
-                        # less than 300 entries to check means 1/sec check times
-                        # the wait is (5 min - entry count) before posting again
-                        wait = 300 - self._post_queue_size
-                    else:
-                        # more than 300 entries means we used the whole 5 min
-                        # to check and post feeds so don't wait any longer to start again
-                        wait = 0
-
-                    log.debug(f"Waiting {wait}s before starting...")
-                    await asyncio.sleep(wait)
+                now = time.time()
+                if not schedule_built or (self._worker[1] > 1 and now >= next_refresh):
+                    # only built once, feed commands keep it up to date afterwards,
+                    # unless other bot instances share the feeds and change them with their own commands
                     await self._put_feeds_in_queue()
-                    if self._post_queue.qsize() > self._post_queue_size:
-                        # there's been more feeds added so let's update the total size
-                        # so feeds have the proper wait time @ > 300 feeds
-                        log.debug(f"Updating total queue size to {self._post_queue.qsize()}")
-                        self._post_queue_size = self._post_queue.qsize()
-                    continue
-                else:
-                    try:
-                        # queue_item is a List of channel_priority: int, total_priority: int, queue_item: SimpleNamespace
-                        await self.get_current_feed(
-                            queue_item[2].channel, queue_item[2].feed_name, queue_item[2].feed_data
-                        )
-                    except aiohttp.client_exceptions.InvalidURL:
-                        log.debug(f"Feed at {url} is bad or took too long to respond.")
+                    schedule_built = True
+                    next_refresh = now + SHARED_SCHEDULE_REFRESH_INTERVAL
+                if now >= next_save:
+                    await self._save_feed_states()
+                    next_save = now + FEED_STATE_SAVE_INTERVAL
+                if self._websub_url and now >= next_websub_renewal:
+                    await self._renew_websub()
+                    next_websub_renewal = now + WEBSUB_RENEW_INTERVAL
+
+                # hand every due feed url to the workers, they keep at most `concurrency` fetches in flight
+                # so that a slow or dead host only holds up its own slot instead of every other feed
+                while self._feed_schedule and self._feed_schedule[0][0] <= now:
+                    due, url = heapq.heappop(self._feed_schedule)
+                    if self._next_check.get(url, None) != due:
+                        # the url was removed or rescheduled since this schedule entry was made
                         continue
-
-                    if self._post_queue_size < 300:
-                        wait = 1
-                    else:
-                        wait = (300 - 10) / self._post_queue_size
-                    log.debug(f"sleeping for {wait}...")
-                    await asyncio.sleep(wait)
+                    if url not in self._reserved_checks:
+                        self._reserved_checks.add(url)
+                        delay = self._get_host_bucket(url).reserve()
+                        if delay:
+                            # the host's request rate is used up, the url waits for its slot in the schedule
+                            # instead of in a worker, so the other hosts' feeds aren't stuck behind it
+                            self._schedule_check(url, now + delay)
+                            continue
+                    self._check_queue.put_nowait(url)
+
+                if self._feed_schedule:
+                    wait = min(max(self._feed_schedule[0][0] - now, 0.1), 1)
+                else:
+                    wait = 1
+                await asyncio.sleep(wait)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 log.error("An error has occurred in the RSS cog. Please report it.", exc_info=e)
+                await asyncio.sleep(1)
+                continue
+        self._set_feed_workers(0)
+
+    def _set_feed_workers(self, count: int):
+        """Starts or stops feed workers until `count` are running."""
+        while len(self._feed_workers) < count:
+            self._feed_workers.append(self.bot.loop.create_task(self._feed_worker()))
+        while len(self._feed_workers) > count:
+            self._feed_workers.pop().cancel()
+
+    async def _feed_worker(self):
+        """Checks due feed urls from the check queue one at a time."""
+        while True:
+            url = await self._check_queue.get()
+            metrics = self._start_check_metrics(url)
+            try:
+                async with self._get_url_lock(url):
+                    subscriptions = await self._get_subscriptions(url)
+                    if subscriptions:
+                        await self.get_current_feeds(url, subscriptions)
+            except asyncio.CancelledError:
+                raise
+            except aiohttp.client_exceptions.InvalidURL:
+                log.debug(f"Feed at {url} is bad or took too long to respond.")
+                self._record_failure(url, "The url is invalid.")
+            except Exception as e:
+                log.error(f"An error has occurred in the RSS cog while checking {url}. Please report it.", exc_info=e)
+            finally:
+                self._reserved_checks.discard(url)
+                if url in self._next_check:
+                    # keep a fixed rate from the last due time so the whole set is still checked every cycle
+                    due = max(self._next_check[url] + self._get_check_interval(url), time.time())
+                    health = self._feed_health.get(url, None)
+                    if health and health.failures:
+                        # failing feeds back off, dead ones don't take a worker again until their probe is due
+                        due = max(due, health.retry_at)
+                    self._schedule_check(url, due)
+                self._dispatch_metrics(url, metrics)
+
+    async def _get_subscriptions(self, url: str):
+        """Helper for the feed workers, gets the current saved data for every feed on a url."""
+        subscriptions = []
+        for sub in self._feed_subscriptions.get(url, []):
+            channel = self._get_postable_channel(sub.channel.id)
+            if channel is None:
+                # the bot left the guild or can't send messages in the channel anymore,
+                # the channel's feeds are scheduled again once it can
+                log.info(f"Can't post in channel {sub.channel.id} anymore, not checking its feed {sub.feed_name}")
+                self._remove_subscription(sub.channel.id, sub.feed_name)
+                continue
+            if await self.bot.cog_disabled_in_guild(self, channel.guild):
+                continue
+            feed_data = await self.config.channel(channel).feeds.get_raw(sub.feed_name, default=None)
+            if not feed_data or self._normalize_url(feed_data["url"]) != url:
+                # the feed was deleted or replaced since the last schedule update
                 continue
+            feed_data = self._get_feed_state(channel, sub.feed_name, feed_data)
+            subscriptions.append(SimpleNamespace(channel=channel, feed_name=sub.feed_name, feed_data=feed_data))
+        return subscriptions
+
+    def _get_postable_channel(self, channel_id: int):
+        """Gets a channel that feeds can be posted in, or None if the bot can't see it or can't send messages in it."""
+        channel = self.bot.get_channel(channel_id)
+        if channel is None or not channel.permissions_for(channel.guild.me).send_messages:
+            return None
+        return channel
+
+    def _record_failure(self, url: str, error: str):
+        """Counts a failed check of a feed url towards its backoff and circuit breaker."""
+        health = self._feed_health.setdefault(url, FeedHealth())
+        health.record_failure(error, self._get_check_interval(url))
+        if health.state == "open":
+            log.warning(
+                f"Feed url {url} failed {health.failures} checks in a row, "
+                f"skipping it until {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(health.retry_at))}"
+            )
+
+    def _record_success(self, url: str):
+        """Closes the circuit breaker of a feed url after a successful check."""
+        health = self._feed_health.setdefault(url, FeedHealth())
+        if health.failures:
+            log.info(f"Feed url {url} is reachable again after {health.failures} failed checks")
+        health.record_success()
+
+    def _record_fetch(self, url: str, latency: float, html):
+        """Helper for _get_url_content, adds a request to the metrics of a scheduled feed url and its host."""
+        url = self._normalize_url(url)
+        if url not in self._feed_subscriptions:
+            return
+        size = len(html) if isinstance(html, bytes) else 0
+        host_metrics = self._host_metrics.setdefault(urlparse(url).netloc, HostMetrics())
+        host_metrics.requests += 1
+        host_metrics.errors += html is None
+        host_metrics.downloaded += size
+        host_metrics.latency += latency
+
+        metrics = self._feed_metrics.setdefault(url, FeedMetrics())
+        metrics.fetch_latency = latency
+        metrics.downloaded += size
+        if size:
+            metrics.size = size
+
+    def _start_check_metrics(self, url: str):
+        """Helper for the feed workers, resets the per check metrics of a feed url when its check starts."""
+        metrics = self._feed_metrics.setdefault(url, FeedMetrics())
+        now = time.time()
+        metrics.queue_lag = max(now - self._next_check.get(url, now), 0)
+        metrics.enrich_time = 0
+        metrics.checks += 1
+        metrics.last_check = now
+        return metrics
+
+    def _dispatch_metrics(self, url: str, metrics: FeedMetrics):
+        """Helper for the feed workers, sends the metrics of a finished check to listeners."""
+        health = self._feed_health.get(url, None) or FeedHealth()
+        host = urlparse(url).netloc
+        host_metrics = self._host_metrics.get(host, None) or HostMetrics()
+        # This event can be used in 3rd-party using listeners, for example to export the metrics.
+        # This may (and most likely will) get changes in the future
+        # so I suggest accepting **kwargs in the listeners using this event.
+        #
+        # url: str
+        #     The normalized feed url that was checked.
+        # metrics: Mapping[str, Any]
+        #     Read-only mapping with the numbers of the feed url, see FeedMetrics,
+        #     plus `consecutive_errors` and `last_success` (a timestamp or None).
+        # host: str
+        #     The host of the feed url.
+        # host_metrics: Mapping[str, Any]
+        #     Read-only mapping with the request totals of the host, see HostMetrics.
+        self.bot.dispatch(
+            "aikaternacogs_rss_feed_metrics",
+            url=url,
+            metrics=MappingProxyType(
+                {**metrics.to_dict(), "consecutive_errors": health.failures, "last_success": health.last_success}
+            ),
+            host=host,
+            host_metrics=MappingProxyType(host_metrics.to_dict()),
+        )
+
+    def _record_arrivals(self, url: str, timestamps: list):
+        """Remembers entry timestamps of a feed url for _get_check_interval."""
+        arrivals = self._arrivals.setdefault(url, deque(maxlen=ARRIVAL_HISTORY))
+        for timestamp in sorted(timestamps):
+            if timestamp not in arrivals:
+                arrivals.append(timestamp)
+
+    def _get_check_interval(self, url: str):
+        """
+        Gets the time until the next check of a feed url from how often it has posted recently:
+        half of the typical time between entries, within the configured bounds.
+        """
+        min_interval, max_interval = self._check_interval_bounds
+        sub = self._websub.get(self._websub_tokens.get(url, None), None)
+        if sub and sub.active:
+            # the feed's hub pushes new entries, checks are only the fallback
+            return max_interval
+        arrivals = sorted(self._arrivals.get(url, ()))
+        if len(arrivals) < 2:
+            return min_interval
+        gaps = [newer - older for older, newer in zip(arrivals, arrivals[1:])]
+        return min(max(statistics.median(gaps) / 2, min_interval), max_interval)
+
+    def _schedule_check(self, url: str, due: float):
+        """Sets the next check time for a feed url."""
+        self._next_check[url] = due
+        heapq.heappush(self._feed_schedule, (due, url))
 
     async def _put_feeds_in_queue(self):
-        log.debug("Putting feeds in queue")
+        """Builds the feed schedule from every saved feed, it's kept up to date by the feed commands afterwards."""
+        log.debug("Building the feed schedule")
+        config_data = await self.config.all_channels()
+        self._feed_subscriptions = {}
+        self._subscription_urls = {}
+        runs_every_shard = self._runs_every_shard()
+        for channel_id, channel_feed_list in config_data.items():
+            cached_channel = self.bot.get_channel(channel_id)
+            if cached_channel is None and not runs_every_shard:
+                # a channel in a guild on the shards of another bot process, which checks it and removes it
+                # when it's gone. it can also be a channel of a guild that isn't available yet, so it's kept
+                continue
+            if cached_channel is not None and not self._is_own_shard(cached_channel.guild):
+                continue
+            channel = await self._get_channel_object(channel_id)
+            if not channel:
+                log.info(
+                    f"Response channel {channel_id} not found, forbidden to access, or no perms to send messages, removing channel from config"
+                )
+                await self.config.channel_from_id(int(channel_id)).clear()  # Remove entries from dead channel
+                continue
+
+            for feed_name, feed_data in channel_feed_list.get("feeds", {}).items():
+                self._add_subscription(channel, feed_name, feed_data["url"])
+
+        for url in list(self._next_check):
+            if url not in self._feed_subscriptions or not self._owns_url(url):
+                self._forget_url(url)
+
+    def _runs_every_shard(self):
+        """Tells if this bot process has the channels of every guild."""
+        shard_ids = getattr(self.bot, "shard_ids", None)
+        return shard_ids is None or len(set(shard_ids)) >= (self.bot.shard_count or 1)
+
+    def _is_own_shard(self, guild: discord.Guild):
+        """Helper for _put_feeds_in_queue, tells if a guild is on one of the shards of this bot process."""
+        shard_ids = getattr(self.bot, "shard_ids", None)
+        return shard_ids is None or guild.shard_id in shard_ids
+
+    def _owns_url(self, url: str):
+        """
+        Tells if a normalized feed url is checked by this bot instance.
+
+        Urls are split between the instances with rendezvous hashing: each url goes to the instance with the highest
+        hash of the url and its index, so changing the instance count only moves the urls of the added or removed ones.
+        Every instance must see the channels of every url, see _get_worker.
+        """
+        index, count = self._worker
+        if count <= 1:
+            return True
+        hashes = [hashlib.blake2b(f"{i}:{url}".encode(), digest_size=8).digest() for i in range(count)]
+        return hashes.index(max(hashes)) == index
+
+    async def _get_worker(self):
+        """
+        Gets the (index, count) of this bot instance from the config shared by every instance.
+
+        Splitting the urls and splitting the channels by shard are alternatives. A url that only channels on the shards
+        of one process subscribe to could be assigned to an instance that never sees those channels, and nobody would
+        check it. So processes that don't run every shard ignore the url split and check every url of their channels.
+        """
+        count = await self.config.worker_count()
+        index = (await self.config.worker_indexes()).get(self._get_instance_name(), 0)
+        if index >= count:
+            return (0, 1)
+        if count > 1 and not self._runs_every_shard():
+            log.warning(
+                f"Feed urls are split between {count} bot instances, but this instance only runs some of the bot's shards. "
+                "It checks every feed url of the guilds on its shards instead."
+            )
+            return (0, 1)
+        return (index, count)
+
+    @staticmethod
+    def _get_instance_name():
+        # a function since Red 3.5, a module attribute before that
+        instance_name = data_manager.instance_name
+        return instance_name() if callable(instance_name) else instance_name
+
+    def _add_subscription(self, channel: discord.TextChannel, feed_name: str, url: str):
+        """Adds a channel's feed to the feed schedule, urls shared by several feeds are fetched once."""
+        url = self._normalize_url(url)
+        if self._subscription_urls.get((channel.id, feed_name), None) != url:
+            self._remove_subscription(channel.id, feed_name)
+            self._subscription_urls[(channel.id, feed_name)] = url
+            self._feed_subscriptions.setdefault(url, []).append(SimpleNamespace(channel=channel, feed_name=feed_name))
+        if url not in self._next_check and self._owns_url(url):
+            # spread first checks over the check interval instead of starting every feed at once
+            self._schedule_check(url, time.time() + zlib.crc32(url.encode()) % self._check_interval_bounds[0])
+            host = urlparse(url).netloc
+            self._host_url_counts[host] = self._host_url_counts.get(host, 0) + 1
+
+    def _remove_subscription(self, channel_id: int, feed_name: str):
+        """Removes a channel's feed from the feed schedule, its url stops being checked if no other feed uses it."""
+        url = self._subscription_urls.pop((channel_id, feed_name), None)
+        if url is None:
+            return
+        self._templates.pop((channel_id, feed_name), None)
+        subscriptions = [
+            sub for sub in self._feed_subscriptions[url] if (sub.channel.id, sub.feed_name) != (channel_id, feed_name)
+        ]
+        if subscriptions:
+            self._feed_subscriptions[url] = subscriptions
+        else:
+            del self._feed_subscriptions[url]
+            self._forget_url(url)
+
+    def _forget_url(self, url: str):
+        """Drops the schedule and the remembered state of a feed url that isn't used anymore."""
+        host = urlparse(url).netloc
+        # the url's entry in the schedule heap is skipped once it comes up
+        if self._next_check.pop(url, None) is not None:
+            self._host_url_counts[host] -= 1
+            if not self._host_url_counts[host]:
+                del self._host_url_counts[host]
+        self._reserved_checks.discard(url)
+        self._arrivals.pop(url, None)
+        self._feed_health.pop(url, None)
+        self._feed_metrics.pop(url, None)
+        self._feed_validators.pop(url, None)
+        self._url_locks.pop(url, None)
+        self.bot.loop.create_task(self._run_in_feed_cache("delete", url))
+        if url in self._websub_tokens:
+            self.bot.loop.create_task(self._unsubscribe_websub(url))
+        if not any(urlparse(other_url).netloc == host for other_url in self._feed_subscriptions):
+            self._host_metrics.pop(host, None)
+            if host in self._host_buckets and self._host_buckets[host].is_full():
+                del self._host_buckets[host]
+
+    def _get_url_lock(self, url: str):
+        """Gets the lock that a feed url's checks and pushed content hold while posting."""
+        if url not in self._url_locks:
+            self._url_locks[url] = asyncio.Lock()
+        return self._url_locks[url]
+
+    async def _start_websub_server(self):
+        """Starts the server that websub hubs send verification requests and pushed content to, returns an error message if it fails."""
+        await self._stop_websub_server()
+        runner = web.AppRunner(self._make_websub_app(), access_log=None)
+        await runner.setup()
+        host = await self.config.websub_host()
+        port = await self.config.websub_port()
         try:
-            config_data = await self.config.all_channels()
-            total_index = 0
-            for channel_id, channel_feed_list in config_data.items():
-                channel = await self._get_channel_object(channel_id)
-                if not channel:
-                    log.info(
-                        f"Response channel {channel_id} not found, forbidden to access, or no perms to send messages, removing channel from config"
-                    )
-                    await self.config.channel_from_id(int(channel_id)).clear()  # Remove entries from dead channel
-                    continue
+            await web.TCPSite(runner, host, port).start()
+        except OSError as e:
+            await runner.cleanup()
+            return f"Couldn't listen on {host}:{port}: {e}"
+        self._websub_runner = runner
+        self._websub_url = await self.config.websub_url()
+        log.debug(f"Websub callback server listening on {host}:{port}")
+        return None
 
-                if await self.bot.cog_disabled_in_guild(self, channel.guild):
-                    continue
+    def _make_websub_app(self):
+        app = web.Application(client_max_size=self._max_feed_size)
+        # the callback url can have a path prefix from a reverse proxy, the last part of the path is the token
+        app.router.add_route("*", "/{tail:.*}", self._websub_callback)
+        return app
+
+    async def _stop_websub_server(self):
+        self._websub_url = None
+        if self._websub_runner:
+            await self._websub_runner.cleanup()
+            self._websub_runner = None
+
+    async def _websub_callback(self, request: web.Request):
+        """Handles the verification requests and the pushed content that websub hubs send."""
+        token = request.path.rstrip("/").rsplit("/", 1)[-1]
+        sub = self._websub.get(token, None)
+        if request.method == "GET":
+            return await self._verify_websub_request(sub, request.query)
+        if request.method != "POST":
+            return web.Response(status=405)
+        if sub is None or sub.mode != "subscribe":
+            # tells the hub that nobody wants this content anymore
+            return web.Response(status=410)
+
+        body = await request.read()
+        if not verify_signature(sub.secret, body, request.headers.get("X-Hub-Signature", "")):
+            # content with a wrong signature still gets a success response, it's only ignored
+            log.debug(f"Ignoring pushed content with a wrong signature for feed url {sub.url}")
+            return web.Response(status=202)
+        self.bot.loop.create_task(self._post_pushed_feed(sub.url, body))
+        return web.Response(status=202)
+
+    async def _verify_websub_request(self, sub: WebSubSubscription, query):
+        """Helper for _websub_callback, confirms to a hub that a subscribe or unsubscribe request came from the bot."""
+        mode = query.get("hub.mode", None)
+        if sub is None or query.get("hub.topic", None) != sub.topic:
+            return web.Response(status=404)
+        if mode == "denied":
+            log.warning(f"The websub hub of feed url {sub.url} denied the subscription: {query.get('hub.reason', 'no reason given')}")
+            # kept so that the feed isn't subscribed to again on every check
+            sub.mode = "denied"
+            await self.config.websub_subscriptions.set_raw(sub.token, value=sub.to_json())
+            return web.Response()
+        if mode != sub.mode:
+            return web.Response(status=404)
+
+        if mode == "subscribe":
+            try:
+                lease_seconds = int(query.get("hub.lease_seconds", LEASE_SECONDS))
+            except ValueError:
+                lease_seconds = LEASE_SECONDS
+            sub.expires = time.time() + lease_seconds
+            await self.config.websub_subscriptions.set_raw(sub.token, value=sub.to_json())
+            log.debug(f"Websub subscription of feed url {sub.url} verified for {lease_seconds} seconds")
+        else:
+            await self._drop_websub(sub)
+        return web.Response(text=query.get("hub.challenge", ""))
 
-                for feed_key, feed in channel_feed_list.items():
-                    for feed_name, feed_data in feed.items():
-                        rss_feed = SimpleNamespace(channel=channel, feed_name=feed_name, feed_data=feed_data)
-                        keys = list(feed.keys())
-                        channel_index = keys.index(feed_name)
-                        total_index += 1
-                        queue_entry = [channel_index, total_index, rss_feed]
-                        log.debug(f"Putting {channel_index}-{total_index}-{channel}-{feed_name} in queue")
-                        await self._post_queue.put(queue_entry)
+    def _discover_websub(self, url: str, feed: feedparser.util.FeedParserDict):
+        """Subscribes to the websub hub that a feed advertises while push mode is enabled, checks stay as the fallback."""
+        url = self._normalize_url(url)
+        if not self._websub_url or url in self._websub_tokens or not self._owns_url(url):
+            return
+        hub, topic = get_hub_links(feed)
+        if not hub:
+            return
+        sub = WebSubSubscription(url, hub, topic)
+        self._websub[sub.token] = sub
+        self._websub_tokens[url] = sub.token
+        self.bot.loop.create_task(self._send_websub_request(sub, "subscribe"))
+
+    async def _send_websub_request(self, sub: WebSubSubscription, mode: str):
+        """Sends a subscribe or unsubscribe request to a websub hub, which verifies it with a request to the callback server."""
+        sub.mode = mode
+        await self.config.websub_subscriptions.set_raw(sub.token, value=sub.to_json())
+        data = {"hub.callback": f"{self._websub_url.rstrip('/')}/{sub.token}", "hub.mode": mode, "hub.topic": sub.topic}
+        if mode == "subscribe":
+            data["hub.secret"] = sub.secret
+            data["hub.lease_seconds"] = str(LEASE_SECONDS)
+        try:
+            async with self._session.post(sub.hub, data=data, timeout=self._timeout) as resp:
+                if resp.status >= 400:
+                    log.warning(f"{resp.status} response from the websub hub {sub.hub} to the {mode} request of feed url {sub.url}")
+                    return False
+            return True
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            log.warning(f"Failure sending the websub {mode} request of feed url {sub.url} to {sub.hub}", exc_info=True)
+            return False
 
+    async def _unsubscribe_websub(self, url: str):
+        """Ends the websub subscription of a feed url that isn't checked anymore."""
+        sub = self._websub.get(self._websub_tokens.get(url, None), None)
+        if sub is None:
+            return
+        if self._websub_url and sub.mode == "subscribe":
+            # dropped once the hub verifies the request, or when the lease expires
+            await self._send_websub_request(sub, "unsubscribe")
+        else:
+            await self._drop_websub(sub)
+
+    async def _drop_websub(self, sub: WebSubSubscription):
+        self._websub.pop(sub.token, None)
+        if self._websub_tokens.get(sub.url, None) == sub.token:
+            del self._websub_tokens[sub.url]
+        await self.config.websub_subscriptions.clear_raw(sub.token)
+
+    async def _renew_websub(self):
+        """Helper for the feed loop, renews the websub subscriptions that expire soon or were never verified."""
+        now = time.time()
+        for sub in list(self._websub.values()):
+            if sub.needs_renewal() and sub.url in self._next_check:
+                self.bot.loop.create_task(self._send_websub_request(sub, "subscribe"))
+            elif sub.mode == "unsubscribe" and sub.expires < now:
+                await self._drop_websub(sub)
+
+    async def _post_pushed_feed(self, url: str, body: bytes):
+        """Posts the new entries of the content that a websub hub pushed for a feed url."""
+        try:
+            async with self._get_url_lock(url):
+                subscriptions = await self._get_subscriptions(url)
+                if not subscriptions:
+                    return
+                feedparser_obj = await self._parse_feed_content(url, body)
+                try:
+                    log.debug(f"{feedparser_obj.error} Pushed content of url: {url}")
+                    return
+                except AttributeError:
+                    pass
+                await self._post_feed_entries(url, subscriptions, feedparser_obj, pushed=True)
         except Exception as e:
-            log.exception(e, exc_info=e)
+            log.error(f"An error has occurred in the RSS cog while posting pushed content of {url}. Please report it.", exc_info=e)
 
-    async def _get_next_in_queue(self):
-        try:
-            to_check = self._post_queue.get_nowait()
-        except asyncio.queues.QueueEmpty:
-            return None
-        return to_check
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        feed_keys = [feed_key for feed_key in self._subscription_urls if feed_key[0] == channel.id]
+        if not feed_keys:
+            return
+        for channel_id, feed_name in feed_keys:
+            self._remove_subscription(channel_id, feed_name)
+        log.info(f"Response channel {channel.id} was deleted, removing channel from config")
+        await self.config.channel_from_id(channel.id).clear()
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if not isinstance(after, discord.TextChannel):
+            return
+        could_send = before.permissions_for(before.guild.me).send_messages
+        can_send = after.permissions_for(after.guild.me).send_messages
+        if could_send and not can_send:
+            self._unsubscribe_channels([after.id])
+        elif can_send and not could_send:
+            await self._subscribe_channels([after])
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        # the feeds stay in config and are scheduled again if the bot joins the guild again
+        self._unsubscribe_channels([channel.id for channel in guild.channels])
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        await self._subscribe_channels(guild.text_channels)
+
+    def _unsubscribe_channels(self, channel_ids: list):
+        """Takes the feeds of channels out of the feed schedule, without removing them from config."""
+        channel_ids = set(channel_ids)
+        for channel_id, feed_name in [feed_key for feed_key in self._subscription_urls if feed_key[0] in channel_ids]:
+            self._remove_subscription(channel_id, feed_name)
+
+    async def _subscribe_channels(self, channels: list):
+        """Adds the saved feeds of the channels that feeds can be posted in to the feed schedule."""
+        for channel in channels:
+            if self._get_postable_channel(channel.id) is None:
+                continue
+            for feed_name, feed_data in (await self.config.channel(channel).feeds()).items():
+                self._add_subscription(channel, feed_name, feed_data["url"])
 
 
 class NoFeedContent(Exception):
@@ -15,6 +15,7 @@ class RssFeed():
         self.embed_color: str = kwargs.get("embed_color", None)
         self.embed_image: str = kwargs.get("embed_image", None)
         self.embed_thumbnail: str = kwargs.get("embed_thumbnail", None)
+        self.seen: List[str] = kwargs.get("seen", [])
 
     def to_json(self) -> dict:
         return {
@@ -30,6 +31,7 @@ class RssFeed():
             "embed_color": self.embed_color,
             "embed_image": self.embed_image,
             "embed_thumbnail": self.embed_thumbnail,
+            "seen": self.seen,
         }
 
     @classmethod
@@ -47,4 +49,5 @@ class RssFeed():
             embed_color=data["embed_color"] if data["embed_color"] else None,
             embed_image=data["embed_image"] if data["embed_image"] else None,
             embed_thumbnail=data["embed_thumbnail"] if data["embed_thumbnail"] else None,
+            seen=data["seen"] if data.get("seen", None) else [],
         )
@@ -0,0 +1,37 @@
+import itertools
+import random
+
+from .color import _RGB_NAME_MAP, _RGB_TREE, _kd_nearest_neighbour, _linear_nearest_neighbour
+
+# Checks the k-d tree search against the brute-force search, run with `python -m pytest rss/test_color.py`
+
+_POINTS = list(_RGB_NAME_MAP)
+
+
+def _assert_same_nearest(pivots):
+    for pivot in pivots:
+        assert _kd_nearest_neighbour(_RGB_TREE, pivot) == _linear_nearest_neighbour(_POINTS, pivot), pivot
+
+
+def test_named_colours():
+    _assert_same_nearest(_POINTS)
+    for index, point in enumerate(_POINTS):
+        assert _kd_nearest_neighbour(_RGB_TREE, point) == (0, index, point)
+
+
+def test_grid():
+    steps = range(0, 256, 15)
+    _assert_same_nearest(itertools.product(steps, steps, steps))
+
+
+def test_random_colours():
+    rng = random.Random(24)
+    _assert_same_nearest(tuple(rng.randrange(256) for _ in range(3)) for _ in range(5000))
+
+
+def test_tie_midpoints():
+    # points halfway between two named colours are as near to both of them, the lowest index has to win
+    midpoints = {
+        tuple((a + b) // 2 for a, b in zip(point_a, point_b)) for point_a, point_b in itertools.combinations(_POINTS, 2)
+    }
+    _assert_same_nearest(midpoints)
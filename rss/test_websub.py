@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import hmac
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from redbot.core import data_manager
+
+from .benchmark import SinkBot, SinkChannel, _rss_fixture, _use_throwaway_data_path
+from .rss import RSS
+from .rss_feed import RssFeed
+from .websub import WebSubSubscription
+
+# Checks the websub callback server through aiohttp's test client, run with `python -m pytest rss/test_websub.py`
+
+FEED_URL = "https://example.com/feed"
+HUB_URL = "https://hub.example.com/"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def red_data_path(tmp_path_factory):
+    basic_config = data_manager.basic_config
+    _use_throwaway_data_path(str(tmp_path_factory.mktemp("red_data")))
+    yield
+    data_manager.basic_config = basic_config
+
+
+async def _make_cog():
+    """Makes a cog with a sink channel subscribed to FEED_URL, and a websub subscription of it waiting for verification."""
+    cog = RSS(SinkBot())
+    await cog.config.clear_all()
+    channel = SinkChannel(1, "feed")
+    cog.bot.channels[channel.id] = channel
+    feed = RssFeed(name=channel.name, template="$title", url=FEED_URL).to_json()
+    # saved like a feed that was never checked, so the first content only learns the current entries
+    feed.pop("seen")
+    await cog.config.channel(channel).feeds.set_raw(channel.name, value=feed)
+    cog._add_subscription(channel, channel.name, FEED_URL)
+    sub = WebSubSubscription(FEED_URL, HUB_URL, FEED_URL)
+    cog._websub[sub.token] = sub
+    cog._websub_tokens[FEED_URL] = sub.token
+    return cog, channel, sub
+
+
+async def _push(client: TestClient, sub: WebSubSubscription, body: bytes, secret: str = None):
+    signature = hmac.new((secret or sub.secret).encode(), body, hashlib.sha256).hexdigest()
+    return await client.post(f"/websub/{sub.token}", data=body, headers={"X-Hub-Signature": f"sha256={signature}"})
+
+
+async def _wait_for_posts(cog: RSS, channel: SinkChannel):
+    """Waits until the pushed content was posted, it's handled in the background after the hub got its response."""
+    for _ in range(200):
+        await asyncio.sleep(0.01)
+        if channel.id not in cog._post_senders and not [
+            task for task in asyncio.all_tasks() if task.get_coro().__name__ == "_post_pushed_feed"
+        ]:
+            return
+
+
+def test_subscribe_challenge():
+    async def run():
+        cog, channel, sub = await _make_cog()
+        async with TestClient(TestServer(cog._make_websub_app())) as client:
+            query = {"hub.mode": "subscribe", "hub.topic": FEED_URL, "hub.challenge": "challenge", "hub.lease_seconds": "600"}
+            resp = await client.get(f"/websub/{sub.token}", params=query)
+            assert resp.status == 200
+            assert await resp.text() == "challenge"
+            assert sub.active and time.time() + 590 < sub.expires <= time.time() + 600
+            assert (await cog.config.websub_subscriptions())[sub.token]["expires"] == sub.expires
+
+            resp = await client.get(f"/websub/{sub.token}", params={**query, "hub.topic": "https://example.com/other"})
+            assert resp.status == 404
+            resp = await client.get("/websub/unknown", params=query)
+            assert resp.status == 404
+
+    asyncio.run(run())
+
+
+def test_bad_signature_is_ignored():
+    async def run():
+        cog, channel, sub = await _make_cog()
+        async with TestClient(TestServer(cog._make_websub_app())) as client:
+            await _push(client, sub, _rss_fixture(range(1, 10)).encode())
+            await _wait_for_posts(cog, channel)
+
+            body = _rss_fixture(range(10)).encode()
+            resp = await _push(client, sub, body, secret="wrong secret")
+            assert resp.status == 202
+            resp = await client.post(f"/websub/{sub.token}", data=body, headers={"X-Hub-Signature": "md5=00"})
+            assert resp.status == 202
+            await _wait_for_posts(cog, channel)
+            assert channel.sent == []
+
+    asyncio.run(run())
+
+
+def test_signed_content_is_posted():
+    async def run():
+        cog, channel, sub = await _make_cog()
+        async with TestClient(TestServer(cog._make_websub_app())) as client:
+            # the first content only learns the entries that are already in the feed
+            resp = await _push(client, sub, _rss_fixture(range(1, 10)).encode())
+            assert resp.status == 202
+            await _wait_for_posts(cog, channel)
+            assert channel.sent == []
+
+            resp = await _push(client, sub, _rss_fixture(range(10)).encode())
+            assert resp.status == 202
+            await _wait_for_posts(cog, channel)
+            assert len(channel.sent) == 1
+            assert "Post 0" in channel.sent[0]["embeds"][0].description
+
+    asyncio.run(run())
@@ -0,0 +1,72 @@
+import hashlib
+import hmac
+import secrets
+import time
+
+# lease asked from hubs, they can grant another one
+LEASE_SECONDS = 10 * 24 * 60 * 60
+# subscriptions are renewed once their lease ends within this many seconds
+RENEW_BEFORE = 24 * 60 * 60
+
+SIGNATURE_ALGORITHMS = ["sha1", "sha256", "sha384", "sha512"]
+
+
+class WebSubSubscription():
+    """
+    A WebSub (PubSubHubbub) subscription of a feed url at its hub.
+
+    mode is the last request sent to the hub, "subscribe" or "unsubscribe".
+    The subscription is active once the hub has verified it, until its lease expires.
+    """
+
+    def __init__(self, url: str, hub: str, topic: str, token: str = None, secret: str = None, mode="subscribe", expires=0):
+        self.url = url
+        self.hub = hub
+        self.topic = topic
+        # last part of the callback url, tells the subscriptions apart
+        self.token = token or secrets.token_hex(8)
+        # hubs sign the content they push with it
+        self.secret = secret or secrets.token_hex(16)
+        self.mode = mode
+        self.expires = expires
+
+    @property
+    def active(self):
+        return self.mode == "subscribe" and self.expires > time.time()
+
+    def needs_renewal(self):
+        return self.mode == "subscribe" and self.expires - time.time() < RENEW_BEFORE
+
+    def to_json(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_json(cls, data: dict):
+        return cls(**data)
+
+
+def get_hub_links(feed: dict):
+    """
+    Finds the hub of a parsed feed header and the topic url to subscribe to at it.
+
+    Returns (hub, topic), or (None, None) if the feed doesn't advertise a hub.
+    """
+    hub = None
+    topic = None
+    for link in feed.get("links", []):
+        if link.get("rel", None) == "hub" and not hub:
+            hub = link.get("href", None)
+        elif link.get("rel", None) == "self" and not topic:
+            topic = link.get("href", None)
+    if not hub or not topic:
+        return None, None
+    return hub, topic
+
+
+def verify_signature(secret: str, body: bytes, signature: str):
+    """Checks the X-Hub-Signature header of pushed content, "algorithm=hex digest"."""
+    algorithm, _, digest = signature.partition("=")
+    if algorithm not in SIGNATURE_ALGORITHMS:
+        return False
+    expected = hmac.new(secret.encode(), body, getattr(hashlib, algorithm)).hexdigest()
+    return hmac.compare_digest(expected, digest.strip().lower())